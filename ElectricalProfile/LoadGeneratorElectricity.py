@@ -7,7 +7,7 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from Modules import module_1, module_2, module_3, module_4, module_plot
+from Modules import module_1, module_2, module_3, module_4, module_plot, module_provenance, module_rollup
 
 
 """
@@ -37,18 +37,29 @@ YEAR = 2020          # 2018, 2019, 2020
 BASE_PATH = ""
 
 
-def run(industry_number, year, base_path_str):
+def run(industry_number, year, base_path_str, start=None, end=None, rollups=False):
+    """
+    Generate, plot and save the annual profile, or only the range between start and end
+    (pandas label slicing, e.g. "2020-03-02", "2020-03-08"), normalised to the full year;
+    a range without time steps in the year raises ValueError.
+    With rollups the hourly, daily and monthly rollup pyramid is saved as extra sheets.
+    """
     base_path = Path(base_path_str) if base_path_str else PROJECT_ROOT
     base_path_str = str(base_path)
+    if start is not None or end is not None:
+        first_step, last_step = module_3.step_range(module_3.quarter_hour_index(year), start, end)
+        if first_step == last_step:
+            raise ValueError(f"The range {start} - {end} selects no time steps of {year}.")
     # ========================
     #     RUN MODULE 1:
     # ========================
-    weekday_profiles, saturday_profiles, sunday_profiles, holiday_profiles, constant_profiles, data_industry_type = (
+    weekday_profiles, saturday_profiles, sunday_profiles, holiday_profiles, constant_profiles, _ = (
         module_1.build_electric_daily_profiles(industry_number, base_path_str)
     )
 
-    industry_type = data_industry_type["WZ_ID"][industry_number]
-    industry_name = str(data_industry_type["Name"][industry_number])
+    catalog = module_1.read_industry_catalog("electrical", base_path_str)
+    industry_type = catalog.value(industry_number, "WZ_ID")
+    industry_name = str(catalog.value(industry_number, "Name"))
     print(industry_name)
 
     # ========================
@@ -57,7 +68,7 @@ def run(industry_number, year, base_path_str):
     weekday_adjusted, saturday_adjusted, sunday_adjusted, holiday_adjusted, constant_adjusted = module_2.apply_peak_base_factors(
         year,
         industry_number,
-        data_industry_type,
+        catalog,
         weekday_profiles,
         saturday_profiles,
         sunday_profiles,
@@ -79,14 +90,26 @@ def run(industry_number, year, base_path_str):
         holiday_adjusted,
         constant_adjusted,
         base_path_str,
+        start=start,
+        end=end,
     )
-    df_normalized = module_3.normalising_1000(df)
+    adjusted = (weekday_adjusted, saturday_adjusted, sunday_adjusted, holiday_adjusted, constant_adjusted)
+    energy_per_year = module_3.annual_energy(array_load_type, *adjusted)
+    df_normalized = module_3.normalising_1000(df, energy_per_year)
 
     # ========================
     #     RUN MODULE 4:
     # ========================
-    df_scaled = module_4.upscale_yearly(year, industry_number, df_normalized, data_industry_type)
-    df_with_fluctuations = module_4.add_fluctuations(industry_number, df_scaled, data_industry_type)
+    df_scaled = module_4.upscale_yearly(year, industry_number, df_normalized, catalog)
+    peak_day = module_4.upscale_yearly(
+        year,
+        industry_number,
+        module_3.normalising_1000(module_3.peak_day(array_load_type, *adjusted), energy_per_year),
+        catalog,
+    )
+    df_with_fluctuations = module_4.add_fluctuations(
+        industry_number, df_scaled, catalog, power_peak=peak_day["Total"].max()
+    )
 
     # Save load data and diagrams
     diagrams_dir = base_path / "Generated" / "diagrams"
@@ -118,7 +141,34 @@ def run(industry_number, year, base_path_str):
     df_out = df_with_fluctuations.copy()
     df_out.columns = columns
     df_out.index.name = "Time"
-    df_out.to_excel(load_data_dir / f"{industry_name} WZ08 {industry_type}.xlsx", index=True)
+    file_name = f"{industry_name} WZ08 {industry_type}"
+    if start is not None or end is not None:
+        first, last = df_out.index[0], df_out.index[-1]
+        # Whole days are named by their dates, other ranges also by their times so they do not overwrite each other
+        whole_days = first == first.normalize() and last == last.normalize() + pd.Timedelta(hours=23, minutes=45)
+        stamp = "%Y-%m-%d" if whole_days else "%Y-%m-%dT%H%M"
+        file_name += f" {first:{stamp}}_{last:{stamp}}"
+    with pd.ExcelWriter(load_data_dir / f"{file_name}.xlsx") as writer:
+        df_out.to_excel(writer, index=True)
+        if rollups:
+            module_rollup.write_pyramid(writer, module_rollup.build_pyramid(df_out))
+
+    # Record the inputs this profile was generated from (see module_batch regenerate --changed)
+    producer = {
+        "kind": "runner",
+        "carrier": "electrical",
+        "industry_number": industry_number,
+        "year": year,
+        "base_path": base_path_str,
+        "start": start,
+        "end": end,
+        "rollups": rollups,
+    }
+    module_provenance.write_provenance(
+        load_data_dir / f"{file_name}.xlsx",
+        producer,
+        module_provenance.input_hashes("electrical", industry_number, year, base_path_str),
+    )
 
     return df_out
 
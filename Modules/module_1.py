@@ -1,50 +1,33 @@
 import pandas as pd
-from pathlib import Path
 
+from Modules import module_inputs
 
 
-def _resolve_project_root(base_path):
-    if base_path:
-        path = Path(base_path)
-    else:
-        path = Path(__file__).resolve().parent.parent
-
-    name = path.name.lower()
-    if name in {"electricalprofile", "thermalprofile"}:
-        return path.parent
-    if name == "data" and path.parent.name.lower() in {"electricalprofile", "thermalprofile"}:
-        return path.parent.parent
+DAY_TYPE_SHEETS = ["Week_day", "Saturday", "Sunday", "Holiday"]
 
-    return path
+# Thermal industry table columns and the application names of the thermal profiles
+THERMAL_RENAME = {
+    "Raumwärme": "Space heating",
+    "Warmwasser": "Hot water",
+    "Prozesswärme < 100 °C": "< 100 °C",
+    "Prozesswärme 100 °C - 500 °C": "100 °C - 500 °C",
+    "Prozesswärme 500 °C - 1000 °C": "500 °C - 1000 °C",
+    "Prozesswärme > 1000 °C": ">1000 °C",
+}
 
 
-def _resolve_existing_path(candidates):
-    for candidate in candidates:
-        if candidate.exists():
-            return candidate
-    raise FileNotFoundError(
-        "None of the expected data files exist: " + ", ".join(str(c) for c in candidates)
-    )
+def read_industry_catalog(carrier, base_path):
+    """
+    Industry table of a carrier indexed by industry_number (module_catalog.IndustryCatalog).
+    """
+    return module_inputs.get_repository(base_path).industry_catalog(carrier)
 
 
 def _read_enduser_profiles(base_path, sheet_name):
     """
-    Read an end-user profile sheet and drop empty rows.
+    Electrical end-user profile sheet, without empty rows and with merged mechanical drive columns.
     """
-    project_root = _resolve_project_root(base_path)
-    data_path = _resolve_existing_path(
-        [
-            project_root / "ElectricalProfile" / "data" / "Load_profiles_enduser.xlsx",
-            project_root / "Electrical" / "Load_profiles_enduser.xlsx",
-        ]
-    )
-    df = pd.read_excel(
-        data_path,
-        index_col=0,
-        sheet_name=sheet_name,
-    )
-    df = df.dropna(axis=0)
-    return df
+    return module_inputs.get_repository(base_path).profile_sheets("electrical")[sheet_name]
 
 
 def _apply_profile_weights(profiles, weights):
@@ -65,69 +48,44 @@ def _apply_profile_weights(profiles, weights):
     return y
 
 
-def _normalize_electric_profile_columns(df):
-    df = df.copy()
-
-    if "Continuous mechanical drive" in df.columns or "Discontinuous mechanical drive" in df.columns:
-        cont = df["Continuous mechanical drive"] if "Continuous mechanical drive" in df.columns else 0
-        disc = df["Discontinuous mechanical drive"] if "Discontinuous mechanical drive" in df.columns else 0
-        df["Mechanical drives"] = cont + disc
-        df = df.drop(columns=[c for c in ["Continuous mechanical drive", "Discontinuous mechanical drive"] if c in df.columns])
-
-    if "Mechanical drive" in df.columns and "Mechanical drives" not in df.columns:
-        df = df.rename(columns={"Mechanical drive": "Mechanical drives"})
-
-    return df
+ELECTRIC_APPLICATIONS = [
+    "Space heating",
+    "Hot water",
+    "Process heat",
+    "Space cooling",
+    "Process cooling",
+    "Lighting",
+    "ICT",
+    "Mechanical drives",
+]
 
 
-def _select_electric_weights(data_industry_type):
-    if "Mechanical drives" not in data_industry_type.columns and "Mechanical drive" in data_industry_type.columns:
-        data_industry_type = data_industry_type.rename(columns={"Mechanical drive": "Mechanical drives"})
-
-    weights = data_industry_type[
-        [
-            "Space heating",
-            "Hot water",
-            "Process heat",
-            "Space cooling",
-            "Process cooling",
-            "Lighting",
-            "ICT",
-            "Mechanical drives",
-        ]
-    ].iloc[0].astype(float)
-    return weights
+def _select_electric_weights(catalog, industry_number):
+    columns = list(ELECTRIC_APPLICATIONS)
+    if "Mechanical drives" not in catalog.columns and "Mechanical drive" in catalog.columns:
+        columns[-1] = "Mechanical drive"
+    return pd.Series(catalog.values(industry_number, columns), index=ELECTRIC_APPLICATIONS)
 
 
 
 def build_electric_daily_profiles(industry_number, base_path):
     """ INPUT: END USER PROFILES """
-    profiles_weekday = _normalize_electric_profile_columns(_read_enduser_profiles(base_path, "Week_day"))
-    profiles_saturday = _normalize_electric_profile_columns(_read_enduser_profiles(base_path, "Saturday"))
-    profiles_sunday = _normalize_electric_profile_columns(_read_enduser_profiles(base_path, "Sunday"))
-    profiles_holiday = _normalize_electric_profile_columns(_read_enduser_profiles(base_path, "Holiday"))
+    profiles_weekday = _read_enduser_profiles(base_path, "Week_day")
+    profiles_saturday = _read_enduser_profiles(base_path, "Saturday")
+    profiles_sunday = _read_enduser_profiles(base_path, "Sunday")
+    profiles_holiday = _read_enduser_profiles(base_path, "Holiday")
     
     profiles_constant = profiles_weekday.copy()
     profiles_constant.loc[:,:] = 1
 
 
     """ INPUT: INDUSTRY DATA """
-    project_root = _resolve_project_root(base_path)
-    all_info_path = _resolve_existing_path(
-        [
-            project_root / "ElectricalProfile" / "data" / "All_info_industry_types_electrical.xlsx",
-            project_root / "Electrical" / "All_info_industry_types_electrical.xlsx",
-        ]
-    )
-    all_info_wz = pd.read_excel(all_info_path)
-    all_info_wz.dropna(how="all", axis=0, inplace=True)
-    all_info_wz.dropna(how="all", axis=1, inplace=True)
-    all_info_wz.fillna(0, inplace=True)
+    catalog = read_industry_catalog("electrical", base_path)
     
 
     """ SELECT DATA FROM THE CHOSEN INDUSTRY """
-    data_industry_type = all_info_wz[all_info_wz.industry_number.eq(industry_number)]  # Filters rows with specific industry_wz
-    weights = _select_electric_weights(data_industry_type)
+    data_industry_type = catalog.frame(industry_number)  # Table row of the chosen industry
+    weights = _select_electric_weights(catalog, industry_number)
  
 
     """ CREATE DAILY PROFILES """
@@ -143,57 +101,44 @@ def build_electric_daily_profiles(industry_number, base_path):
     
 def build_thermal_daily_profiles(industry_number, base_path):
     """ INPUT: END USER PROFILES """
-    project_root = _resolve_project_root(base_path)
-    thermal_data_path = _resolve_existing_path(
-        [
-            project_root / "ThermalProfile" / "data" / "Load_profiles_daytypes.xlsx",
-            project_root / "Thermal" / "Load_profiles_daytypes.xlsx",
-        ]
-    )
-    profiles_weekday = pd.read_excel(thermal_data_path, sheet_name="Week_day", index_col=0)
-    profiles_saturday = pd.read_excel(thermal_data_path, sheet_name="Saturday", index_col=0) 
-    profiles_sunday = pd.read_excel(thermal_data_path, sheet_name="Sunday", index_col=0)
-    profiles_holiday = pd.read_excel(thermal_data_path, sheet_name="Holiday", index_col=0)
+    thermal_sheets = module_inputs.get_repository(base_path).profile_sheets("thermal")
+    profiles_weekday = thermal_sheets["Week_day"]
+    profiles_saturday = thermal_sheets["Saturday"]
+    profiles_sunday = thermal_sheets["Sunday"]
+    profiles_holiday = thermal_sheets["Holiday"]
     
     profiles_constant = profiles_weekday.copy()
     profiles_constant.loc[:,:] =1
     
     
     """ INPUT: INDUSTRY DATA """
-    all_info_path = _resolve_existing_path(
-        [
-            project_root / "ThermalProfile" / "data" / "All_info_industry_types_thermal.xlsx",
-            project_root / "Thermal" / "All_info_industry_types_thermal.xlsx",
-        ]
-    )
-    all_info_wz = pd.read_excel(all_info_path)
-    all_info_wz.dropna(how="all",axis=0, inplace=True)
-    all_info_wz.dropna(how="all",axis=1, inplace=True)
-    all_info_wz.fillna(0, inplace=True)
+    catalog = read_industry_catalog("thermal", base_path)
     
 
     """ SELECT DATA FROM THE CHOSEN INDUSTRY """
-    data_industry_type = all_info_wz[all_info_wz.industry_number.eq(industry_number)]  # Filters rows with specific industry_wz
-    data_industry = data_industry_type.iloc[:, 3:9]  # Extracts temperature range values
-    data_industry = data_industry.astype(float)
+    data_industry_type = catalog.frame(industry_number)  # Table row of the chosen industry
+    temperature_ranges = list(THERMAL_RENAME)
+    weights = pd.Series(catalog.values(industry_number, temperature_ranges), index=temperature_ranges)
 
 
     """ CREATE DAILY PROFILES """   
-    weights = data_industry.iloc[0]
-
-    thermal_rename = {
-        "Raumwärme": "Space heating",
-        "Warmwasser": "Hot water",
-        "Prozesswärme < 100 °C": "< 100 °C",
-        "Prozesswärme 100 °C - 500 °C": "100 °C - 500 °C",
-        "Prozesswärme 500 °C - 1000 °C": "500 °C - 1000 °C",
-        "Prozesswärme > 1000 °C": ">1000 °C",
-    }
-
-    weekday_profiles = _apply_profile_weights(profiles_weekday, weights).rename(columns=thermal_rename)
-    saturday_profiles = _apply_profile_weights(profiles_saturday, weights).rename(columns=thermal_rename)
-    sunday_profiles = _apply_profile_weights(profiles_sunday, weights).rename(columns=thermal_rename)
-    holiday_profiles = _apply_profile_weights(profiles_holiday, weights).rename(columns=thermal_rename)
-    constant_profiles = _apply_profile_weights(profiles_constant, weights).rename(columns=thermal_rename)
+
+    weekday_profiles = _apply_profile_weights(profiles_weekday, weights).rename(columns=THERMAL_RENAME)
+    saturday_profiles = _apply_profile_weights(profiles_saturday, weights).rename(columns=THERMAL_RENAME)
+    sunday_profiles = _apply_profile_weights(profiles_sunday, weights).rename(columns=THERMAL_RENAME)
+    holiday_profiles = _apply_profile_weights(profiles_holiday, weights).rename(columns=THERMAL_RENAME)
+    constant_profiles = _apply_profile_weights(profiles_constant, weights).rename(columns=THERMAL_RENAME)
     
     return weekday_profiles, saturday_profiles, sunday_profiles, holiday_profiles, constant_profiles, data_industry_type
+
+
+
+def build_daily_profiles(carrier, industry_number, base_path):
+    """
+    Build the daily profiles for an energy carrier ("electrical" or "thermal").
+    """
+    if carrier == "electrical":
+        return build_electric_daily_profiles(industry_number, base_path)
+    if carrier == "thermal":
+        return build_thermal_daily_profiles(industry_number, base_path)
+    raise ValueError(f"Unknown carrier '{carrier}', expected 'electrical' or 'thermal'.")
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 
+from Modules import module_catalog
+
 
 
 def _adjust_total(total, factor, ref_idx=0, base=100):
@@ -27,6 +29,21 @@ def _resolve_factor_column(data_industry_type, candidates):
     raise KeyError(f"None of the factor columns found: {', '.join(candidates)}")
 
 
+def read_peak_base_factors(data_industry_type, industry_number):
+    """
+    Return the raw (Peak_factor, Base_factor) workbook values of an industry; 0 means not set.
+
+    data_industry_type is an IndustryCatalog (module_1.read_industry_catalog) or the
+    industry's table rows.
+    """
+    peak_col = _resolve_factor_column(data_industry_type, ["Peak_factor", "Peak_faktor"])
+    base_col = _resolve_factor_column(data_industry_type, ["Base_factor", "Base_faktor"])
+    return (
+        float(module_catalog.industry_value(data_industry_type, industry_number, peak_col)),
+        float(module_catalog.industry_value(data_industry_type, industry_number, base_col)),
+    )
+
+
 
 def apply_peak_base_factors(year, industry_number, data_industry_type, 
                             weekday_1, saturday_1, sunday_1, holiday_1, constant_1):
@@ -57,8 +74,8 @@ def apply_peak_base_factors(year, industry_number, data_industry_type,
     peak_actual = np.max(y)
 
     # Step 3:
-    peak_col = _resolve_factor_column(data_industry_type, ["Peak_factor", "Peak_faktor"])
-    peak_target = (float(data_industry_type[data_industry_type["industry_number"] == industry_number][peak_col].iloc[0]) - 1) * 100
+    peak_factor, base_factor = read_peak_base_factors(data_industry_type, industry_number)
+    peak_target = (peak_factor - 1) * 100
     if peak_target == -100: 
         peak_target = peak_actual
     
@@ -72,8 +89,7 @@ def apply_peak_base_factors(year, industry_number, data_industry_type,
     """ SATURDAY ADJUSTMENT """
     y = saturday_1["Total"] - saturday_1["Total"].iloc[0]
     base_actual = np.min(y)
-    base_col = _resolve_factor_column(data_industry_type, ["Base_factor", "Base_faktor"])
-    base_target = (float(data_industry_type[data_industry_type["industry_number"] == industry_number][base_col].iloc[0]) - 1) * 100
+    base_target = (base_factor - 1) * 100
     if base_target == -100:
         base_target = base_actual
     saturday = _adjust_total(saturday_1["Total"], base_target / base_actual)
@@ -95,3 +111,52 @@ def apply_peak_base_factors(year, industry_number, data_industry_type,
     constant_adjusted = _redistribute(constant_1, constant)
     
     return weekday_adjusted, saturday_adjusted, sunday_adjusted, holiday_adjusted, constant_adjusted
+
+
+
+def apply_peak_base_factors_batch(stack, columns, peak_factor, base_factor):
+    """
+    Vectorized counterpart of apply_peak_base_factors for many factor scenarios at once.
+
+    stack holds the unadjusted daily profiles ordered by load type, as returned by
+    module_3.stack_day_profiles, optionally with leading batch dimensions. peak_factor and
+    base_factor are raw workbook values (0 means not set) and broadcast against those batch
+    dimensions, so an array of S factor pairs yields S adjusted stacks in one pass.
+    The same five steps as in apply_peak_base_factors are applied to every scenario.
+    """
+    stack = np.asarray(stack, dtype=float)
+    totals = stack[..., columns.index("Total")]  # (..., 5, 96)
+
+    # Step 1-2: extrema of the shifted weekday and saturday totals
+    weekday = totals[..., 0, :]
+    saturday = totals[..., 2, :]
+    peak_actual = np.max(weekday - weekday[..., :1], axis=-1)
+    base_actual = np.min(saturday - saturday[..., :1], axis=-1)
+
+    # Step 3: targets with fallback to the actual value when the factor is missing
+    peak_target = (np.asarray(peak_factor, dtype=float) - 1) * 100
+    peak_target = np.where(peak_target == -100, peak_actual, peak_target)
+    base_target = (np.asarray(base_factor, dtype=float) - 1) * 100
+    base_target = np.where(base_target == -100, base_actual, base_target)
+
+    # Step 4: rescale weekday, holiday, saturday and sunday around their reference timestep
+    peak_scale = peak_target / peak_actual
+    base_scale = base_target / base_actual
+    peak_scale, base_scale, base_target = np.broadcast_arrays(peak_scale, base_scale, base_target)
+    scale = np.stack([peak_scale, base_scale, base_scale, base_scale], axis=-1)  # (..., 4)
+
+    reference = totals[..., [0, 1, 2, 3], [0, 0, 0, 95]]  # (..., 4)
+    shifted = totals[..., :4, :] - reference[..., None]
+    varying = shifted * scale[..., None] + 100
+
+    # Constant load is 100 + base target at every timestep
+    batch_shape = np.broadcast_shapes(varying.shape[:-2], base_target.shape)
+    n_steps = totals.shape[-1]
+    varying = np.broadcast_to(varying, batch_shape + (4, n_steps))
+    constant = np.broadcast_to((100 + base_target)[..., None, None], batch_shape + (1, n_steps))
+    new_totals = np.concatenate([varying, constant], axis=-2)
+
+    # Step 5: redistribute across applications with the original shares
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shares = stack / totals[..., None]
+    return np.round(shares * new_totals[..., None], 2)
@@ -1,7 +1,35 @@
 import pandas as pd
+import numpy as np
 import datetime
 import holidays
-from pathlib import Path
+
+from Modules import module_inputs
+
+
+
+def holiday_list(year):
+    """
+    Holidays of a year as a DataFrame with "date" (datetime.date) and "name" columns:
+    German statutory holidays plus Epiphany (Jan 6), Christmas Eve (Dec 24) and
+    New Year's Eve (Dec 31).
+    """
+    dates = []
+    names = []
+    
+    # Add German statutory holidays
+    for date, name in sorted(holidays.Germany(years=year).items()):
+        dates.append(date)
+        names.append(name)
+    
+    # Add additional relevant dates
+    dates.append(datetime.date(year, 1, 6))    # Epiphany
+    dates.append(datetime.date(year, 12, 24))  # Christmas Eve
+    dates.append(datetime.date(year, 12, 31))  # New Year's Eve
+    names.append("Epiphany")
+    names.append("Christmas Eve")
+    names.append("New Year's Eve")
+    
+    return pd.DataFrame({"date": dates, "name": names}, index=None)
 
 
 
@@ -37,24 +65,8 @@ def build_load_type_calendar(year):
     year_list = list(year_list)
     
     # Collect all holidays
-    dates = []
-    names = []
-    
-    # Add German statutory holidays
-    for date, name in sorted(holidays.Germany(years=year).items()):
-        dates.append(date)
-        names.append(name)
-    
-    # Add additional relevant dates
-    dates.append(datetime.date(year, 1, 6))    # Epiphany
-    dates.append(datetime.date(year, 12, 24))  # Christmas Eve
-    dates.append(datetime.date(year, 12, 31))  # New Year's Eve
-    names.append("Epiphany")
-    names.append("Christmas Eve")
-    names.append("New Year's Eve")
-    
-    # Create DataFrame with holidays
-    list_holidays = pd.DataFrame({"date": dates, "name": names}, index=None)
+    list_holidays = holiday_list(year)
+    dates = set(list_holidays["date"])
     
     # Add "bridge days" (days adjacent to holidays that impact working patterns)
     for i in list_holidays["date"]:
@@ -74,7 +86,7 @@ def build_load_type_calendar(year):
     array_wd_we = []
     for i in year_list:
         # Weekday that is not a holiday
-        if datetime.datetime.weekday(i) in [0, 1, 2, 3, 4] and i not in dates:
+        if datetime.datetime.weekday(i) in [0, 1, 2, 3, 4] and i.date() not in dates:
             array_wd_we.append(1)
         # Weekend or holiday
         else:
@@ -124,88 +136,249 @@ def build_load_type_calendar(year):
 
 
 
-def _resolve_project_root(base_path):
-    if base_path:
-        path = Path(base_path)
-    else:
-        path = Path(__file__).resolve().parent.parent
+# Load pattern types in code order (1-5), as used by the stacked daily profiles
+LOAD_TYPES = ["weekday", "holiday", "saturday", "sunday", "constant"]
+
+
+def load_type_codes(index):
+    """
+    Load pattern type (1-5) of every timestamp of a DatetimeIndex, which may span several years.
+    """
+    codes = np.empty(len(index), dtype=np.int8)
+    for year in index.year.unique():
+        in_year = index.year == year
+        calendar = np.asarray(build_load_type_calendar(int(year))[1], dtype=np.int8)
+        codes[in_year] = calendar[index[in_year].dayofyear - 1]
+    return codes
 
-    name = path.name.lower()
-    if name in {"electricalprofile", "thermalprofile"}:
-        return path.parent
-    if name == "data" and path.parent.name.lower() in {"electricalprofile", "thermalprofile"}:
-        return path.parent.parent
 
-    return path
+def _load_type_code(load_type):
+    if isinstance(load_type, (int, np.integer)):
+        return int(load_type)
+    return LOAD_TYPES.index(load_type) + 1
 
 
-def _resolve_existing_path(candidates):
-    for candidate in candidates:
-        if candidate.exists():
-            return candidate
-    raise FileNotFoundError(
-        "None of the expected data files exist: " + ", ".join(str(c) for c in candidates)
-    )
+def _week_mask(working_week):
+    """
+    Working days Monday-Sunday as 7 booleans, from e.g. "1111110" or [1, 1, 1, 1, 1, 1, 0].
+    """
+    if working_week is None:
+        working_week = "1111100"
+    if isinstance(working_week, str):
+        working_week = [char == "1" for char in working_week]
+    mask = np.asarray(working_week, dtype=bool)
+    if mask.shape != (7,):
+        raise ValueError(f"A working week needs 7 entries (Monday-Sunday), got {working_week!r}.")
+    return mask
+
+
+def site_calendars(year, sites):
+    """
+    Load pattern type calendars of many sites, shape (n_sites, n_days) int8.
+
+    Each site is a dict with an optional "working_week" (7 working day flags Monday-Sunday,
+    e.g. "1111110" for a six day week) and optional "forced" ranges [(start, end, load_type)]
+    that set the load type of the days from start to end (inclusive, partial dates allowed,
+    load_type a LOAD_TYPES name or code 1-5), e.g. ("2020-08-03", "2020-08-21", "constant")
+    for a summer shutdown. Later ranges win where they overlap; forced days do not change the
+    classification of their neighbours.
+
+    The holidays of holiday_list are non-working days for every working week, including
+    holidays on a Saturday or Sunday of six or seven day weeks, and a site without overrides
+    gets exactly the base calendar. Working weeks and forced ranges are applied as array
+    masks over all sites at once, so every site keeps pointing into the shared daily profiles.
+    """
+    dates = pd.date_range(f"{year}-01-01", f"{year}-12-31", freq="D")
+    weekday = dates.dayofweek.to_numpy()
+
+    holiday = dates.isin(pd.to_datetime(holiday_list(year)["date"]))
+    weeks = np.stack([_week_mask(site.get("working_week")) for site in sites]) if sites else np.zeros((0, 7), bool)
+    working = weeks[:, weekday] & ~holiday
+
+    # Neighbour rules of build_load_type_calendar; outside the year counts as non-working
+    before = np.pad(working[:, :-1], ((0, 0), (1, 0)))
+    after = np.pad(working[:, 1:], ((0, 0), (0, 1)))
+    calendars = np.where(working, 1, 5 - 2 * before - after).astype(np.int8)
+
+    """ FORCED DATE RANGES """
+    bounds = {}  # Day positions of each distinct (start, end) pair, shared by the sites using it
+    ranges = []
+    for number, site in enumerate(sites):
+        for start, end, load_type in site.get("forced", ()):
+            if (start, end) not in bounds:
+                bounds[start, end] = step_range(dates, start, end)
+            ranges.append((number, *bounds[start, end], _load_type_code(load_type)))
+
+    if ranges:
+        site, first, last, code = (np.array(column) for column in zip(*ranges))
+        days = np.arange(len(dates))
+        covered = (days >= first[:, None]) & (days < last[:, None])  # (n_ranges, n_days)
+
+        # Number of the last range covering each day of each site (0: not forced)
+        winner = np.zeros(calendars.shape, dtype=np.int64)
+        np.maximum.at(winner, site, covered * np.arange(1, len(ranges) + 1)[:, None])
+        calendars = np.where(winner > 0, np.append(0, code)[winner], calendars).astype(np.int8)
+
+    return calendars
+
+
+
+def quarter_hour_index(year):
+    """
+    Continuous 15-minute datetime index covering the whole year.
+    """
+    return pd.date_range(datetime.datetime(year, 1, 1, 0, 0),
+                         datetime.datetime(year, 12, 31, 23, 45),
+                         freq="15min")
+
+
+def read_month_factors(path):
+    """
+    The 12 monthly heating degree day factors as a read-only float array (January first).
+    """
+    return module_inputs.get_repository(path).month_factors()
+
+
+def stack_day_profiles(weekday_adjusted, saturday_adjusted, sunday_adjusted, holiday_adjusted, constant_adjusted):
+    """
+    Stack the five daily profiles into one array ordered by load pattern type.
+
+    Row k of the stack holds the profile for load type k + 1 (weekday, holiday, saturday,
+    sunday, constant), so a calendar from build_load_type_calendar can be used directly
+    as a gather index. Returns the (5, 96, n_columns) array and its column labels.
+    """
+    columns = list(weekday_adjusted.columns)
+    frames = [weekday_adjusted, holiday_adjusted, saturday_adjusted, sunday_adjusted, constant_adjusted]
+    stack = np.stack([frame[columns].to_numpy(dtype=float) for frame in frames])
+    return stack, columns
+
+
+def seasonality_array(year_list, array_load_type, stack, columns, month_factor):
+    """
+    Vectorized counterpart of seasonality() working on stacked daily profiles.
+
+    The stack comes from stack_day_profiles() and may carry leading batch dimensions
+    (..., 5, 96, n_columns); each day is gathered from its load type and space heating is
+    multiplied by the monthly HDD factor. Returns an array of shape (..., n_days * 96, n_columns).
+    """
+    load_type = np.asarray(array_load_type) - 1
+    months = np.array([day.month for day in year_list]) - 1
+
+    days = np.asarray(stack, dtype=float)[..., load_type, :, :]  # Fancy indexing returns a copy
+    heating = columns.index("Space heating")
+    days[..., heating] *= np.asarray(month_factor, dtype=float)[months][:, None]
+
+    return days.reshape(days.shape[:-3] + (-1, days.shape[-1]))
+
+
+def step_range(index, start=None, end=None):
+    """
+    Positions [first_step, last_step) of a label range in a 15-minute index.
+
+    start and end follow pandas label slicing (both inclusive, partial date strings allowed).
+    """
+    steps = index.slice_indexer(start, end)
+    first_step = steps.start if steps.start is not None else 0
+    last_step = steps.stop if steps.stop is not None else len(index)
+    return first_step, max(first_step, last_step)
 
 
 def seasonality(year, year_list, array_load_type, 
                 weekday_adjusted, saturday_adjusted, sunday_adjusted, holiday_adjusted, constant_adjusted, 
-                path):
+                path, start=None, end=None):
     """
     This function applies seasonal adjustment to space heating based on heating degree days (HDD).
     
     Heating degree days account for temperature variations throughout the year:
     - High HDD in winter → high heating demand
     - Low HDD in summer → low heating demand
+
+    With start and/or end (pandas label slicing, e.g. "2020-03-02", "2020-03-08") only the
+    days of that range are built; use annual_energy() to normalise such a partial profile.
     """
     # Read heating degree day factors by month
-    project_root = _resolve_project_root(path)
-    hdd_path = _resolve_existing_path(
-        [
-            project_root / "HeatingDegreeDays.xlsx",
-            project_root / "ElectricalProfile" / "data" / "HeatingDegreeDays.xlsx",
-            project_root / "ThermalProfile" / "data" / "HeatingDegreeDays.xlsx",
-            project_root / "data" / "HeatingDegreeDays.xlsx",
-        ]
+    month_factor = read_month_factors(path)
+    
+    # Stack of daily profiles, row k holding load pattern type k + 1
+    stack, columns = stack_day_profiles(
+        weekday_adjusted, saturday_adjusted, sunday_adjusted, holiday_adjusted, constant_adjusted
     )
-    month_factor = pd.read_excel(hdd_path, sheet_name="HDD")
-    month_factor = month_factor.iloc[0][1:13]  # Extract 12 monthly factors
     
-    # Dictionary mapping load pattern types to their respective load profiles
-    profiles = []
-    dict_load_type = {
-        1: weekday_adjusted,
-        2: holiday_adjusted,
-        3: saturday_adjusted,
-        4: sunday_adjusted,
-        5: constant_adjusted,
-    }
+    # Select the days covering the requested range
+    idx = quarter_hour_index(year)
+    first_step, last_step = step_range(idx, start, end)
+    first_day, last_day = first_step // 96, -(-last_step // 96)
     
-    # Apply seasonal adjustment for each day
-    for i in range(len(year_list)):
-        dayprofile = dict_load_type[array_load_type[i]].copy()
-        # Multiply space heating by monthly HDD factor
-        dayprofile["Space heating"] = dayprofile["Space heating"] * month_factor.iloc[year_list[i].month - 1]
-        profiles.append(dayprofile)
-
-    df = pd.concat(profiles, ignore_index=True)
+    # Gather each day from its load type and multiply space heating by the monthly HDD factor
+    values = seasonality_array(
+        year_list[first_day:last_day], array_load_type[first_day:last_day], stack, columns, month_factor
+    )
+    offset = first_day * 96
     
-    # Create continuous datetime index with 15-minute intervals
-    idx = pd.date_range(datetime.datetime(year, 1, 1, 0, 0),
-                        datetime.datetime(year, 12, 31, 23, 45),
-                        freq="15min")
-    df.index = idx
+    # Continuous datetime index with 15-minute intervals
+    df = pd.DataFrame(
+        values[first_step - offset:last_step - offset],
+        index=idx[first_step:last_step],
+        columns=columns,
+    )
     
     return df
 
 
 
-def normalising_1000(df):
+def stack_annual_energy(array_load_type, stack, columns):
+    """
+    Annual energy (MWh) of the Total column of an assembled year, from day type counts.
+
+    Equivalent to summing the Total column of seasonality() over the full year, without
+    assembling it: seasonality only rescales space heating, so the annual Total is the
+    count of each load pattern type times the daily Total of its profile. Works on stacks
+    with leading batch dimensions (..., 5, 96, n_columns) and returns an array of shape (...).
+    """
+    counts = np.bincount(np.asarray(array_load_type) - 1, minlength=5)
+    total = np.asarray(stack, dtype=float)[..., columns.index("Total")]
+    return total.sum(axis=-1) @ counts * 0.25 / 1000  # 0.25 = 15 min intervals in hours
+
+
+def annual_energy(array_load_type, 
+                  weekday_adjusted, saturday_adjusted, sunday_adjusted, holiday_adjusted, constant_adjusted):
+    """
+    Annual energy consumption (MWh) used by normalising_1000, computed in closed form.
+    """
+    stack, columns = stack_day_profiles(
+        weekday_adjusted, saturday_adjusted, sunday_adjusted, holiday_adjusted, constant_adjusted
+    )
+    return float(stack_annual_energy(array_load_type, stack, columns))
+
+
+def peak_day(array_load_type, 
+             weekday_adjusted, saturday_adjusted, sunday_adjusted, holiday_adjusted, constant_adjusted):
+    """
+    Daily profile of the load pattern type with the highest Total occurring in the year.
+
+    Passing it through normalising_1000 and upscale_yearly gives the annual peak of a
+    partial profile, as needed by add_fluctuations.
+    """
+    stack, columns = stack_day_profiles(
+        weekday_adjusted, saturday_adjusted, sunday_adjusted, holiday_adjusted, constant_adjusted
+    )
+    present = np.unique(np.asarray(array_load_type)) - 1
+    best = present[np.argmax(stack[present, :, columns.index("Total")].max(axis=1))]
+    return pd.DataFrame(stack[best], columns=columns, index=weekday_adjusted.index)
+
+
+
+def normalising_1000(df, energy_per_year=None):
     """
     Scales the load profile to a standard annual consumption of 1000 MWh.
+
+    energy_per_year is the annual consumption of the unscaled profile in MWh. It is summed
+    from df if not given, which requires df to cover the full year; pass annual_energy()
+    to normalise a partial profile.
     """
     # Calculate actual annual energy consumption in MWh
-    energy_per_year = float(df["Total"].sum() * 0.25 / 1000)  # 0.25 = 15 min intervals in hours
+    if energy_per_year is None:
+        energy_per_year = float(df["Total"].sum() * 0.25 / 1000)  # 0.25 = 15 min intervals in hours
 
     # Scale all values to reach 1000 MWh/year
     df_normalized = df / (energy_per_year / 1000)
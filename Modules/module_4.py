@@ -1,5 +1,7 @@
 import numpy as np
 
+from Modules import module_catalog
+
 
 def _resolve_energy_column(year, columns):
     prefixes = ["Energy consumption ", "Energieverbrauch "]
@@ -24,13 +26,24 @@ def _resolve_energy_column(year, columns):
 
 
 
+def read_energy_per_year(year, data_industry_type, industry_number=None):
+    """
+    Annual consumption of the industry for the given year (latest available year as fallback).
+
+    data_industry_type is an IndustryCatalog, which needs the industry_number, or the
+    industry's table rows.
+    """
+    energy_col = _resolve_energy_column(year, data_industry_type.columns)
+    return float(module_catalog.industry_value(data_industry_type, industry_number, energy_col))
+
+
+
 def upscale_yearly(year, industry_number, df_normalized, data_industry_type):
     """
     Scale the normalized annual profile to the industry's actual yearly consumption.
     """
     # Get actual energy consumption for this industry and year
-    energy_col = _resolve_energy_column(year, data_industry_type.columns)
-    energy_per_year_MWh = float(data_industry_type[energy_col].iloc[0])
+    energy_per_year_MWh = read_energy_per_year(year, data_industry_type, industry_number)
     
     # Scale the normalized profile to actual consumption
     df_scaled = df_normalized * energy_per_year_MWh
@@ -42,27 +55,161 @@ def upscale_yearly(year, industry_number, df_normalized, data_industry_type):
 
 
 
-def add_fluctuations(industry_number, df_scaled, data_industry_type):
+def fluctuation_sigma(s_norm, power_peak):
+    """
+    Absolute standard deviation (kW) of the fluctuations for a given peak power.
+
+    Works element-wise on arrays, so a whole grid of fluctuation factors and peaks can be
+    evaluated at once.
+    """
+    # Scale the fluctuation to actual power level
+    s_rel = s_norm * (100 / power_peak) ** 0.5
+
+    # Convert relative fluctuation (%) to absolute value (kW)
+    return s_rel / 100 * power_peak
+
+
+
+def _as_matrix(covariance):
+    """
+    Store covariance matrices as nested lists so noise models stay JSON serialisable.
+    """
+    return None if covariance is None else np.asarray(covariance, dtype=float).tolist()
+
+
+def white_noise(covariance=None):
+    """
+    Noise model: independent Gaussian noise at every timestep (the original add_fluctuations model).
+
+    covariance optionally correlates the noise across applications (n_columns x n_columns,
+    relative to the fluctuation variance; the identity means independent columns).
+    """
+    return {"kind": "white", "covariance": _as_matrix(covariance)}
+
+
+def ar1_noise(correlation_time, covariance=None):
+    """
+    Noise model: AR(1) / Ornstein-Uhlenbeck noise with the given correlation time in hours.
+
+    Consecutive 15-minute steps are correlated with phi = exp(-0.25 / correlation_time) while
+    the marginal variance stays the one of white noise. covariance as in white_noise().
+    """
+    return {"kind": "ar1", "correlation_time": float(correlation_time), "covariance": _as_matrix(covariance)}
+
+
+def _ar1_phi(noise_model):
+    return float(np.exp(-0.25 / noise_model["correlation_time"]))
+
+
+def noise_memory_steps(noise_model, tolerance=1e-12):
+    """
+    Number of past timesteps that influence the noise of a timestep (0 for white noise).
+
+    AR(1) weights phi**k below tolerance are dropped, so noise computed from this many
+    preceding innovations matches noise computed from the start of the series.
+    """
+    if noise_model["kind"] == "white":
+        return 0
+    phi = _ar1_phi(noise_model)
+    span, weight = 1, phi
+    while weight >= tolerance:
+        span, weight = span * 2, weight * weight
+    return span
+
+
+def _ar1_filter(innovations, phi, span):
+    """
+    Apply x[t] = phi * x[t-1] + e[t] along axis -2 without a Python loop over timesteps.
+
+    Uses log2(span) doubling passes: after the pass with shift s every x[t] holds the
+    sum over phi**j * e[t-j] for j < 2s, so the whole series is filtered in about 16
+    vectorized operations regardless of the number of profiles.
+    """
+    x = np.array(innovations, dtype=float)
+    n_steps = x.shape[-2]
+    shift, weight = 1, phi
+    while shift < min(span, n_steps):
+        x[..., shift:, :] += weight * x[..., :-shift, :]
+        shift, weight = shift * 2, weight * weight
+    return x
+
+
+def filter_noise(noise_model, innovations):
+    """
+    Turn standard normal innovations of shape (..., n_steps, n_columns) into model noise.
+
+    The result has unit variance per column (scaled by the covariance diagonal if given)
+    and can be multiplied by the fluctuation sigma in kW.
+    """
+    noise = np.asarray(innovations, dtype=float)
+    covariance = noise_model.get("covariance")
+    if covariance is not None:
+        noise = noise @ np.linalg.cholesky(np.asarray(covariance, dtype=float)).T
+
+    if noise_model["kind"] == "white":
+        return noise
+    if noise_model["kind"] == "ar1":
+        phi = _ar1_phi(noise_model)
+        scale = np.full(noise.shape[-2], np.sqrt(1 - phi ** 2))
+        scale[0] = 1  # Start from the stationary distribution
+        return _ar1_filter(noise * scale[:, None], phi, noise_memory_steps(noise_model))
+    raise ValueError(f"Unknown noise model '{noise_model['kind']}', expected 'white' or 'ar1'.")
+
+
+def fluctuation_noise(noise_model, sigma, n_steps, n_columns=1, seed=None):
+    """
+    Rounded fluctuation noise in kW for many profiles at once.
+
+    sigma is a scalar or an array of n_profiles standard deviations (see fluctuation_sigma);
+    returns an array of shape (n_steps, n_columns) or (n_profiles, n_steps, n_columns).
+    """
+    sigma = np.asarray(sigma, dtype=float)
+    rng = np.random.default_rng(seed)
+    innovations = rng.standard_normal(sigma.shape + (n_steps, n_columns))
+    return (filter_noise(noise_model, innovations) * sigma[..., None, None]).round(0)
+
+
+
+def add_fluctuations(industry_number, df_scaled, data_industry_type, power_peak=None,
+                     noise_model=None, columns=("Mechanical drives",), seed=None):
     """
     Add realistic fluctuations to mechanical drives.
+
+    power_peak is the annual peak of the scaled Total in kW. It defaults to the peak of
+    df_scaled and must be given when df_scaled only covers part of the year.
+
+    Without noise_model and seed the original white noise from np.random is added to
+    mechanical drives. Otherwise noise from noise_model (white_noise() by default, see also
+    ar1_noise()) is drawn from a generator seeded with seed and added to each of the given
+    columns; the total receives the sum.
     """
     # Get fluctuation factor from industry data (relative to 100 kW baseline)
-    s_norm = data_industry_type["Fluctuation"][industry_number]
+    s_norm = module_catalog.industry_value(data_industry_type, industry_number, "Fluctuation")
     
     # Find actual peak power in the load profile
-    power_peak = np.max(df_scaled["Total"])
-    
-    # Scale the fluctuation to actual power level
-    s_rel = s_norm * (100 / power_peak) ** 0.5
+    if power_peak is None:
+        power_peak = np.max(df_scaled["Total"])
     
-    # Convert relative fluctuation (%) to absolute value (kW)
-    s_abs = s_rel / 100 * power_peak
-    
-    # Generate noise
-    rand_numbers = np.random.normal(0, s_abs, len(df_scaled)).round(0)
+    # Standard deviation of the fluctuations in kW
+    s_abs = fluctuation_sigma(s_norm, power_peak)
     
-    # Add fluctuations to mechanical drives and recalculate total
-    df_scaled["Mechanical drives"] = df_scaled["Mechanical drives"] + rand_numbers
-    df_scaled["Total"] = df_scaled["Total"] + rand_numbers
+    if noise_model is None and seed is None:
+        # Generate noise
+        rand_numbers = np.random.normal(0, s_abs, len(df_scaled)).round(0)
+        
+        # Add fluctuations to mechanical drives and recalculate total
+        df_scaled["Mechanical drives"] = df_scaled["Mechanical drives"] + rand_numbers
+        df_scaled["Total"] = df_scaled["Total"] + rand_numbers
+        
+        return df_scaled
+
+    # Generate noise from the model for all selected columns at once
+    noise_model = noise_model or white_noise()
+    rand_numbers = fluctuation_noise(noise_model, s_abs, len(df_scaled), len(columns), seed)
+
+    # Add fluctuations to the selected columns and recalculate total
+    for i, column in enumerate(columns):
+        df_scaled[column] = df_scaled[column] + rand_numbers[:, i]
+    df_scaled["Total"] = df_scaled["Total"] + rand_numbers.sum(axis=1)
     
     return df_scaled
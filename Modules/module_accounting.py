@@ -0,0 +1,162 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from Modules import module_3
+
+
+QUANTITIES = ["energy_MWh", "cost", "emissions_t"]
+
+
+
+def read_time_series(path, column=None, sheet_name=0):
+    """
+    Read a price or emission factor time series from a .csv or .xlsx file.
+
+    The first column holds the timestamps. Returns a Series for a single value column (or the
+    given column), otherwise a DataFrame with one column per site.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        data = pd.read_csv(path, index_col=0)
+    else:
+        data = pd.read_excel(path, sheet_name=sheet_name, index_col=0)
+    data.index = pd.to_datetime(data.index)
+    data = data.sort_index()
+
+    if column is not None:
+        return data[column].astype(float)
+    if data.shape[1] == 1:
+        return data.iloc[:, 0].astype(float)
+    return data.astype(float)
+
+
+
+def tou_tariff(index, bands, default=None):
+    """
+    Time-of-use price of every timestamp, from price bands per load pattern type.
+
+    bands maps load types (module_3.LOAD_TYPES names such as "weekday" or "sunday", or codes
+    1-5) to lists of (start_hour, end_hour, price) bands, e.g.
+    {"weekday": [(0, 8, 90.0), (8, 20, 180.0), (20, 24, 90.0)]}. Load types without bands
+    use default. The day types come from the same calendar as build_load_type_calendar, so
+    holidays are priced like the profile treats them; bridge days are ordinary working days
+    in that calendar and get the weekday bands.
+    """
+    table = np.full((5, 96), np.nan if default is None else float(default))
+    for load_type, type_bands in bands.items():
+        code = load_type if isinstance(load_type, (int, np.integer)) else module_3.LOAD_TYPES.index(load_type) + 1
+        for start_hour, end_hour, price in type_bands:
+            table[code - 1, int(round(start_hour * 4)):int(round(end_hour * 4))] = price
+
+    index = pd.DatetimeIndex(index)
+    steps = np.asarray(index.hour * 4 + index.minute // 15)
+    prices = table[module_3.load_type_codes(index) - 1, steps]
+    if np.isnan(prices).any():
+        raise ValueError("The tariff bands do not cover every time step; add bands or a default price.")
+    return pd.Series(prices, index=index, name="price")
+
+
+
+def _series_end(series_index, freq=None):
+    """
+    End of the period a time series covers: its last timestamp plus one interval (None: no end).
+
+    The interval is freq, else the frequency of the index (set, or inferred from at least three
+    timestamps, e.g. "h" for hourly or "MS" for monthly values). A single value without a
+    frequency is a constant from its timestamp on.
+    """
+    if freq is None:
+        freq = series_index.freq or (pd.infer_freq(series_index) if len(series_index) >= 3 else None)
+    if freq is None:
+        if len(series_index) == 1:
+            return None
+        raise ValueError("The interval of the time series cannot be inferred from its timestamps; pass freq.")
+    return series_index[-1] + pd.tseries.frequencies.to_offset(freq)
+
+
+def _align(values, index, sites, freq=None):
+    """
+    Align a scalar, a Series or a per-site DataFrame to the profile index, shape (n_steps, n_sites).
+
+    Coarser series (e.g. hourly prices) are held until their next timestamp; the last value
+    is held for one interval of the series only (see _series_end), so a series has to span
+    the whole profile.
+    """
+    if values is None:
+        return np.zeros((len(index), len(sites)))
+    if np.isscalar(values):
+        return np.full((len(index), len(sites)), float(values))
+
+    values = values.sort_index()
+    end = _series_end(values.index, freq)
+    aligned = values.reindex(index, method="ffill")
+    if end is not None:
+        aligned.loc[index >= end] = np.nan  # Do not carry the last value past the end of the series
+    if isinstance(aligned, pd.DataFrame):
+        aligned = aligned[list(sites)].to_numpy(dtype=float)
+    else:
+        aligned = np.repeat(aligned.to_numpy(dtype=float)[:, None], len(sites), axis=1)
+    if np.isnan(aligned).any():
+        raise ValueError("The time series does not cover the whole profile period.")
+    return aligned
+
+
+def _stack_profiles(profiles):
+    """
+    Stack one profile or a dict of profiles with equal index and columns to (n_sites, n_steps, n_columns).
+    """
+    frames = {None: profiles} if isinstance(profiles, pd.DataFrame) else dict(profiles)
+    flat = {}
+    for site, df in frames.items():
+        if isinstance(df.columns, pd.MultiIndex):
+            df = df.copy()
+            df.columns = df.columns.get_level_values(0)
+        flat[site] = df
+
+    first = next(iter(flat.values()))
+    for site, df in flat.items():
+        if not df.index.equals(first.index) or list(df.columns) != list(first.columns):
+            raise ValueError(f"Profile {site} does not share the index and columns of the portfolio.")
+
+    stack = np.stack([df.to_numpy(dtype=float) for df in flat.values()])
+    return stack, list(flat), first.index, list(first.columns)
+
+
+def account(profiles, prices, emission_factors=None, freq=None):
+    """
+    Energy, cost and emissions per application for one profile or a portfolio.
+
+    profiles is a profile DataFrame in kW (15-minute steps, one column per application and
+    Total) or a dict of such profiles sharing index and columns. prices (currency per MWh)
+    and emission_factors (kg CO2 per MWh) are scalars, Series (e.g. from read_time_series or
+    tou_tariff) or DataFrames with one column per site of the portfolio. Each series covers
+    its timestamps up to one interval after the last; freq gives that interval (e.g. "MS")
+    for series whose frequency cannot be inferred from the index.
+
+    All sites, applications and quantities are computed in one batched matrix product.
+    Returns a DataFrame with the QUANTITIES as columns, indexed by application for a single
+    profile and by (site, application) for a portfolio.
+    """
+    stack, sites, index, columns = _stack_profiles(profiles)
+
+    # Per step and site: MWh per kW, cost per kW and tonnes of CO2 per kW
+    hours = 0.25  # 15 min intervals in hours
+    weights = np.stack(
+        [
+            np.full((len(index), len(sites)), hours / 1000),
+            _align(prices, index, sites, freq) * hours / 1000,
+            _align(emission_factors, index, sites, freq) * hours / 1000 / 1000,
+        ],
+        axis=-1,
+    )
+    totals = np.matmul(stack.transpose(0, 2, 1), weights.transpose(1, 0, 2))  # (sites, applications, quantities)
+
+    if isinstance(profiles, pd.DataFrame):
+        return pd.DataFrame(totals[0], index=pd.Index(columns, name="Application"), columns=QUANTITIES)
+    return pd.DataFrame(
+        totals.reshape(-1, len(QUANTITIES)),
+        index=pd.MultiIndex.from_product([sites, columns], names=["Site", "Application"]),
+        columns=QUANTITIES,
+    )
@@ -0,0 +1,290 @@
+import argparse
+import datetime
+import hashlib
+import importlib.util
+import itertools
+import json
+import os
+from pathlib import Path
+
+from Modules import module_compress, module_provenance
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+RUNNERS = {
+    "electrical": PROJECT_ROOT / "ElectricalProfile" / "LoadGeneratorElectricity.py",
+    "thermal": PROJECT_ROOT / "ThermalProfile" / "LoadGeneratorThermal.py",
+}
+
+
+OUTPUT_FORMATS = {"npz", "xlsx"}
+
+
+
+def _now():
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_tasks(carriers, industry_numbers, years, scenarios=None, seeds=None):
+    """
+    Cartesian product of carriers, industries, years, scenarios and seeds as a task list.
+
+    A scenario is a dict with an optional "name" and factor overrides passed to
+    module_compress.compress_profile (peak_factor, base_factor, fluctuation); None stands
+    for the workbook values.
+    """
+    scenarios = scenarios or [{"name": "base"}]
+    seeds = seeds or [None]
+    tasks = []
+    for carrier, industry_number, year, scenario, seed in itertools.product(
+        carriers, industry_numbers, years, scenarios, seeds
+    ):
+        tasks.append(
+            {
+                "carrier": carrier,
+                "industry_number": int(industry_number),
+                "year": int(year),
+                "scenario": dict(scenario),
+                "seed": seed,
+            }
+        )
+    return tasks
+
+
+def task_id(task):
+    """
+    Stable identifier of a task, also used as output file name.
+    """
+    scenario = task["scenario"]
+    name = scenario.get("name") or hashlib.sha256(json.dumps(scenario, sort_keys=True).encode()).hexdigest()[:8]
+    return f"{task['carrier']}-{task['industry_number']}-{task['year']}-{name}-{task['seed']}"
+
+
+
+def read_manifest(manifest_path):
+    """
+    Latest manifest record per task id. Unreadable lines (e.g. from an interrupted write) are ignored.
+    """
+    records = {}
+    if not Path(manifest_path).exists():
+        return records
+    with open(manifest_path, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            records[record["task_id"]] = record
+    return records
+
+
+def _append_manifest(manifest_path, record):
+    with open(manifest_path, "a", encoding="utf-8") as handle:
+        handle.write(json.dumps(record) + "\n")
+        handle.flush()
+        os.fsync(handle.fileno())
+
+
+def _is_complete(record, input_hash, output_path):
+    """
+    A task is complete if it finished with the same inputs and its output is still intact.
+    """
+    return (
+        record is not None
+        and record.get("status") == "done"
+        and record.get("input_hash") == input_hash
+        and output_path.exists()
+        and _sha256_file(output_path) == record.get("checksum")
+    )
+
+
+
+def _write_output(task, output_path, base_path, output_format, provenance):
+    """
+    Generate one profile and write it atomically (temporary file, then rename).
+
+    The provenance record is embedded in .npz outputs and written next to .xlsx outputs.
+    """
+    scenario = {key: value for key, value in task["scenario"].items() if key != "name"}
+    profile = module_compress.compress_profile(
+        task["industry_number"],
+        task["year"],
+        base_path=base_path,
+        carrier=task["carrier"],
+        seed=task["seed"],
+        **scenario,
+    )
+
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    if output_format == "npz":
+        profile["provenance"] = provenance
+        with open(tmp_path, "wb") as handle:
+            module_compress.save_compressed(profile, handle)
+    else:
+        df = module_compress.decode_profile(profile)
+        df.index.name = "Time"
+        df.to_excel(tmp_path, index=True, engine="openpyxl")
+        module_provenance.write_provenance(output_path, {"kind": "batch", "task": task}, provenance)
+    os.replace(tmp_path, output_path)
+
+
+def run_batch(tasks, output_dir, manifest_path=None, base_path="", output_format="npz", retries=2):
+    """
+    Run a list of tasks (see build_tasks), recording progress in a JSON lines manifest.
+
+    Every finished or failed attempt appends one record with the task's provenance (hashes of
+    its industry row, template sheets, HDD row, year and code version), an input hash over
+    provenance and task parameters, and the checksum of its output. Tasks whose
+    latest record is "done" with unchanged inputs and an intact output are skipped, failed
+    tasks are retried up to retries times, so an interrupted batch resumes by calling
+    run_batch again with the same arguments. Returns the final status per task id.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"Unknown output format '{output_format}', expected one of {', '.join(sorted(OUTPUT_FORMATS))}."
+        )
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = Path(manifest_path) if manifest_path else output_dir / "manifest.jsonl"
+    manifest = read_manifest(manifest_path)
+
+    tables = {}
+    statuses = {}
+
+    for task in tasks:
+        identifier = task_id(task)
+        output_path = output_dir / f"{identifier}.{output_format}"
+
+        try:
+            # Read the inputs of each carrier once per run
+            if task["carrier"] not in tables:
+                tables[task["carrier"]] = module_provenance.read_input_tables(task["carrier"], base_path)
+            provenance = module_provenance.input_hashes(
+                task["carrier"], task["industry_number"], task["year"], tables=tables[task["carrier"]]
+            )
+        except Exception:  # Unknown carrier or industry, missing workbook: the attempt below fails and is recorded
+            provenance = {}
+        fingerprint = {"task": task, "provenance": provenance}
+        input_hash = hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode()).hexdigest()
+
+        if _is_complete(manifest.get(identifier), input_hash, output_path):
+            statuses[identifier] = "skipped"
+            continue
+
+        for attempt in range(1, retries + 2):
+            record = {
+                "task_id": identifier,
+                "task": task,
+                "input_hash": input_hash,
+                "provenance": provenance,
+                "output_format": output_format,
+                "attempt": attempt,
+            }
+            try:
+                _write_output(task, output_path, base_path, output_format, provenance)
+            except Exception as error:  # Recorded in the manifest and retried
+                record.update(status="failed", error=f"{type(error).__name__}: {error}", finished_at=_now())
+                _append_manifest(manifest_path, record)
+                continue
+            record.update(
+                status="done", output=output_path.name, checksum=_sha256_file(output_path), finished_at=_now()
+            )
+            _append_manifest(manifest_path, record)
+            break
+
+        statuses[identifier] = record["status"]
+
+    return statuses
+
+
+
+def _load_runner(carrier):
+    """
+    Import the runner script of a carrier (ElectricalProfile / ThermalProfile) as a module.
+    """
+    path = RUNNERS[carrier]
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    runner = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(runner)
+    return runner
+
+
+def regenerate(base_path="", batch_dirs=(), changed_only=True):
+    """
+    Rebuild outputs whose recorded provenance no longer matches the current inputs.
+
+    Runner outputs are found through their provenance records in Generated/load_profiles and
+    rebuilt with the runner's run(); batch outputs are found through the manifests in
+    batch_dirs and rebuilt by run_batch, which skips tasks with unchanged provenance. With
+    changed_only=False every runner output is rebuilt. Returns, per output, the list of
+    changed inputs (runner outputs) or the batch status.
+    """
+    base_path = Path(base_path) if base_path else PROJECT_ROOT
+    results = {}
+    tables = {}
+    runners = {}
+
+    for output_path in module_provenance.find_provenance(base_path / "Generated" / "load_profiles"):
+        record = module_provenance.read_provenance(output_path)
+        producer = record["producer"]
+        if producer.get("kind") != "runner":
+            continue
+
+        carrier = producer["carrier"]
+        key = (carrier, producer["base_path"])
+        if key not in tables:
+            tables[key] = module_provenance.read_input_tables(carrier, producer["base_path"])
+        current = module_provenance.input_hashes(
+            carrier, producer["industry_number"], producer["year"], tables=tables[key]
+        )
+        changed = module_provenance.changed_inputs(record["inputs"], current)
+        if changed_only and not changed and output_path.exists():
+            continue
+
+        if carrier not in runners:
+            runners[carrier] = _load_runner(carrier)
+        runners[carrier].run(
+            producer["industry_number"],
+            producer["year"],
+            producer["base_path"],
+            start=producer.get("start"),
+            end=producer.get("end"),
+            rollups=producer.get("rollups", False),
+        )
+        results[str(output_path)] = changed or ["forced"]
+
+    for batch_dir in batch_dirs:
+        batch_dir = Path(batch_dir)
+        manifest = read_manifest(batch_dir / "manifest.jsonl")
+        for output_format in sorted(OUTPUT_FORMATS):
+            tasks = [record["task"] for record in manifest.values() if record.get("output_format") == output_format]
+            if tasks:
+                statuses = run_batch(tasks, batch_dir, base_path=str(base_path), output_format=output_format)
+                results.update({f"{batch_dir / task}": status for task, status in statuses.items()})
+
+    return results
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch generation of load profiles.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    regenerate_parser = commands.add_parser("regenerate", help="Rebuild outputs from their provenance records.")
+    regenerate_parser.add_argument("--changed", action="store_true", help="Only rebuild outputs whose inputs changed.")
+    regenerate_parser.add_argument("--base-path", default="", help="Project root with the data and Generated folders.")
+    regenerate_parser.add_argument("--batch-dir", action="append", default=[], help="Batch output folder (repeatable).")
+    args = parser.parse_args()
+
+    results = regenerate(args.base_path, args.batch_dir, changed_only=args.changed)
+    for output, reason in results.items():
+        print(f"{output}: {reason if isinstance(reason, str) else ', '.join(reason)}")
@@ -0,0 +1,119 @@
+import numbers
+
+import numpy as np
+
+
+
+def _is_number(value):
+    return isinstance(value, numbers.Real) and not isinstance(value, bool)
+
+
+def _industry_positions(table):
+    """
+    Table row positions of the industries (integer industry_number above 0), skipping the
+    unit row, empty rows and footnotes.
+    """
+    positions = []
+    for position, value in enumerate(table["industry_number"].to_numpy()):
+        if _is_number(value) and float(value).is_integer() and value > 0:
+            positions.append(position)
+    return np.array(positions, dtype=np.intp)
+
+
+def _typed_column(values):
+    """
+    Read-only array of one column: float64 if every value is a number, else the objects as read.
+    """
+    if all(_is_number(value) for value in values):
+        column = np.asarray(values, dtype=float)
+    else:
+        column = np.array(values, dtype=object)
+    column.flags.writeable = False
+    return column
+
+
+
+class IndustryCatalog:
+    """
+    Industry table of a carrier parsed once into typed columns indexed by industry_number.
+
+    Every column is one read-only array over the industries (float64 for numeric columns,
+    objects such as the WZ_ID codes otherwise) in the order of numbers, and a dict maps each
+    industry_number to its position, so single values are O(1) lookups and whole columns
+    are used without filtering the table. The table itself stays available for code that
+    needs the rows as read (frame).
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self._rows = _industry_positions(table)
+        self.numbers = table["industry_number"].to_numpy()[self._rows].astype(int)
+        self.numbers.flags.writeable = False
+        self.columns = list(table.columns)
+
+        self._positions = {}
+        for position, industry_number in enumerate(self.numbers):
+            self._positions.setdefault(int(industry_number), position)  # First row wins, as with .iloc[0]
+        self._columns = {
+            column: _typed_column(table.iloc[self._rows, i].tolist()) for i, column in enumerate(self.columns)
+        }
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def __contains__(self, industry_number):
+        return industry_number in self._positions
+
+    def position(self, industry_number):
+        """
+        Position of an industry in the column arrays.
+        """
+        try:
+            return self._positions[industry_number]
+        except (KeyError, TypeError):
+            raise KeyError(f"Unknown industry_number {industry_number!r}.") from None
+
+    def column(self, column):
+        """
+        One column for all industries, aligned with numbers.
+        """
+        if column not in self._columns:
+            raise KeyError(f"Unknown industry column '{column}'.")
+        return self._columns[column]
+
+    def value(self, industry_number, column):
+        return self.column(column)[self.position(industry_number)]
+
+    def values(self, industry_number, columns):
+        """
+        Several numeric columns of one industry as a float array in the order of columns.
+        """
+        position = self.position(industry_number)
+        return np.array([self.column(column)[position] for column in columns], dtype=float)
+
+    def row(self, industry_number):
+        """
+        All values of one industry (column -> value).
+        """
+        position = self.position(industry_number)
+        return {column: values[position] for column, values in self._columns.items()}
+
+    def frame(self, industry_number):
+        """
+        The industry's table row as read, as a one-row DataFrame (the former industry_number filter).
+        """
+        return self.table.iloc[[self._rows[self.position(industry_number)]]]
+
+
+
+def industry_value(industry, industry_number, column):
+    """
+    One value of an industry from an IndustryCatalog or from industry table rows (DataFrame).
+
+    With a DataFrame and industry_number None the first row is used.
+    """
+    if isinstance(industry, IndustryCatalog):
+        return industry.value(industry_number, column)
+    if industry_number is None:
+        return industry[column].iloc[0]
+    return industry.loc[industry["industry_number"].eq(industry_number), column].iloc[0]
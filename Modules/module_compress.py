@@ -0,0 +1,301 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from Modules import module_1, module_2, module_3, module_4
+
+
+FORMAT_VERSION = 1
+
+
+
+def _day_dates(year, n_days):
+    return pd.date_range(f"{year}-01-01", periods=n_days, freq="D")
+
+
+def _day_innovations(seed, days, n_columns):
+    """
+    Standard normal innovations for the given day numbers, shape (n_days * 96, n_columns).
+
+    Every day draws from its own stream seeded by (seed, day), so any range of days can be
+    regenerated without drawing the days before it.
+    """
+    return np.concatenate(
+        [np.random.default_rng([seed, int(day)]).standard_normal((96, n_columns)) for day in days]
+    )
+
+
+def _range_unit_noise(noise, first_day, last_day):
+    """
+    Noise of unit sigma for days [first_day, last_day), shape (n_days, 96, n_columns).
+
+    Correlated models are warmed up on the preceding days they depend on (see
+    module_4.noise_memory_steps), so a range decodes to the same noise as the full year.
+    """
+    model = noise.get("model") or module_4.white_noise()
+    n_columns = len(noise["columns"])
+    warmup_days = -(-module_4.noise_memory_steps(model) // 96)
+    start_day = max(0, first_day - warmup_days)
+
+    innovations = _day_innovations(noise["seed"], range(start_day, last_day), n_columns)
+    values = module_4.filter_noise(model, innovations)[(first_day - start_day) * 96:]
+    return values.reshape(-1, 96, n_columns)
+
+
+def _range_noise(noise, first_day, last_day):
+    """
+    Rounded noise in kW for days [first_day, last_day), shape (n_days, 96, n_columns).
+    """
+    return (noise["sigma"] * _range_unit_noise(noise, first_day, last_day)).round(0)
+
+
+def build_compressed(carrier, industry_number, year, templates, columns, calendar, month_factor,
+                     energy_per_year_MWh, seed=None, fluctuation=0.0, noise_columns=("Mechanical drives",),
+                     noise_model=None):
+    """
+    Build the compressed representation of an annual profile.
+
+    templates are the adjusted daily profiles ordered by load type (module_3.stack_day_profiles),
+    calendar the load pattern types (1-5) of every day and month_factor the 12 HDD factors.
+    The normalisation constant of normalising_1000 follows from module_3.stack_annual_energy.
+    If a seed and a non-zero fluctuation are given, a noise descriptor (seed, sigma, columns
+    and a module_4 noise model, white by default) is stored instead of the noise itself.
+    """
+    templates = np.asarray(templates, dtype=float)
+    calendar = np.asarray(calendar, dtype=np.int8)
+    normalisation = float(module_3.stack_annual_energy(calendar, templates, columns)) / 1000
+
+    noise = None
+    if seed is not None and fluctuation:
+        total = templates[np.unique(calendar) - 1, :, columns.index("Total")]
+        power_peak = float(np.max((total / normalisation * energy_per_year_MWh).round(0)))
+        noise = {
+            "seed": int(seed),
+            "fluctuation": float(fluctuation),
+            "sigma": float(module_4.fluctuation_sigma(fluctuation, power_peak)),
+            "columns": list(noise_columns),
+            "model": noise_model or module_4.white_noise(),
+        }
+
+    return {
+        "format_version": FORMAT_VERSION,
+        "carrier": carrier,
+        "industry_number": int(industry_number),
+        "year": int(year),
+        "columns": list(columns),
+        "templates": templates,
+        "calendar": calendar,
+        "month_factor": np.asarray(month_factor, dtype=float),
+        "normalisation": normalisation,
+        "energy_per_year_MWh": float(energy_per_year_MWh),
+        "noise": noise,
+    }
+
+
+
+def compress_profile(industry_number, year, base_path="", carrier="electrical",
+                     peak_factor=None, base_factor=None, fluctuation=None, seed=None,
+                     noise_model=None, noise_columns=("Mechanical drives",), calendar=None):
+    """
+    Run modules 1-2 and store the annual profile in compressed form.
+
+    Factor arguments override the workbook values (None keeps them). Fluctuations are only
+    described when a seed is given, and only for electrical profiles; noise_model and
+    noise_columns select the module_4 noise model and the applications it is added to.
+    calendar replaces the load type calendar of the year, e.g. a row of module_3.site_calendars.
+    """
+    weekday_profiles, saturday_profiles, sunday_profiles, holiday_profiles, constant_profiles, _ = (
+        module_1.build_daily_profiles(carrier, industry_number, base_path)
+    )
+    stack, columns = module_3.stack_day_profiles(
+        weekday_profiles, saturday_profiles, sunday_profiles, holiday_profiles, constant_profiles
+    )
+
+    catalog = module_1.read_industry_catalog(carrier, base_path)
+    peak_default, base_default = module_2.read_peak_base_factors(catalog, industry_number)
+    templates = module_2.apply_peak_base_factors_batch(
+        stack,
+        columns,
+        peak_default if peak_factor is None else peak_factor,
+        base_default if base_factor is None else base_factor,
+    )
+
+    if carrier == "electrical" and fluctuation is None:
+        fluctuation = float(catalog.value(industry_number, "Fluctuation"))
+
+    if calendar is None:
+        _, calendar = module_3.build_load_type_calendar(year)
+
+    return build_compressed(
+        carrier,
+        industry_number,
+        year,
+        templates,
+        columns,
+        calendar,
+        module_3.read_month_factors(base_path),
+        module_4.read_energy_per_year(year, catalog, industry_number),
+        seed=seed,
+        fluctuation=fluctuation or 0.0,
+        noise_columns=noise_columns,
+        noise_model=noise_model,
+    )
+
+
+
+def decode_profile(profile, start=None, end=None):
+    """
+    Decode a time range of a compressed profile into the 15-minute DataFrame of modules 3-4.
+
+    start and end follow pandas label slicing (both inclusive, partial date strings allowed),
+    e.g. decode_profile(profile, "2020-03-02", "2020-03-08") for one week. Only the days
+    touched by the range are gathered from the templates.
+    """
+    year = profile["year"]
+    columns = profile["columns"]
+    calendar = profile["calendar"]
+
+    index = module_3.quarter_hour_index(year)
+    first_step, last_step = module_3.step_range(index, start, end)
+    if last_step == first_step:
+        return pd.DataFrame(columns=columns, index=index[:0], dtype=float)
+
+    first_day, last_day = first_step // 96, -(-last_step // 96)
+    days = np.arange(first_day, last_day)
+
+    # Gather day templates, apply HDD seasonality, normalise and upscale (modules 3-4)
+    values = profile["templates"][calendar[days] - 1]  # (n_days, 96, n_columns)
+    months = _day_dates(year, len(calendar))[days].month - 1
+    values[..., columns.index("Space heating")] *= profile["month_factor"][months][:, None]
+    values = (values / profile["normalisation"] * profile["energy_per_year_MWh"]).round(0)
+
+    noise = profile["noise"]
+    if noise is not None:
+        rand_numbers = _range_noise(noise, first_day, last_day)
+        for i, column in enumerate(noise["columns"]):
+            values[..., columns.index(column)] += rand_numbers[..., i]
+        values[..., columns.index("Total")] += rand_numbers.sum(axis=-1)
+
+    values = values.reshape(-1, len(columns))
+    offset = first_day * 96
+    return pd.DataFrame(
+        values[first_step - offset:last_step - offset],
+        index=index[first_step:last_step],
+        columns=columns,
+    )
+
+
+
+def compress_sites(profile, calendars):
+    """
+    Compressed profiles of many sites sharing the daily templates of profile.
+
+    calendars holds one load type calendar per site (e.g. from module_3.site_calendars). Each
+    site gets its own normalisation and noise sigma for its calendar, while the templates,
+    HDD factors and noise seed are shared objects, not copies.
+    """
+    noise = profile["noise"] or {}
+    return [
+        build_compressed(
+            profile["carrier"],
+            profile["industry_number"],
+            profile["year"],
+            profile["templates"],
+            profile["columns"],
+            calendar,
+            profile["month_factor"],
+            profile["energy_per_year_MWh"],
+            seed=noise.get("seed"),
+            fluctuation=noise.get("fluctuation", 0.0),
+            noise_columns=noise.get("columns", ("Mechanical drives",)),
+            noise_model=noise.get("model"),
+        )
+        for calendar in np.asarray(calendars)
+    ]
+
+
+def _noise_stream(profile):
+    """
+    The parts of a noise descriptor that sites must share to draw from the same stream.
+    """
+    return {key: value for key, value in (profile["noise"] or {}).items() if key in {"seed", "model", "columns"}}
+
+
+def decode_sites(profiles, column="Total", start=None, end=None):
+    """
+    Decode one column of many site profiles (see compress_sites) in one gather.
+
+    The profiles must share year, columns, HDD factors and noise seed and model; their
+    templates may be shared (compress_sites) or differ per site (e.g. module_mix). Returns a
+    DataFrame with the 15-minute index of the range and one column per site, equal to
+    decode_profile(profile, start, end)[column] of every site.
+    """
+    first = profiles[0]
+    year = first["year"]
+    columns = first["columns"]
+    for profile in profiles[1:]:
+        if profile["year"] != year or profile["columns"] != columns or _noise_stream(profile) != _noise_stream(first):
+            raise ValueError("decode_sites needs profiles sharing year, columns and noise seed and model.")
+
+    index = module_3.quarter_hour_index(year)
+    first_step, last_step = module_3.step_range(index, start, end)
+    first_day, last_day = first_step // 96, -(-last_step // 96)
+    if last_step == first_step:
+        return pd.DataFrame(index=index[:0], columns=range(len(profiles)), dtype=float)
+
+    # Gather the column of every site and day from the (shared or per-site) templates
+    calendars = np.stack([profile["calendar"][first_day:last_day] for profile in profiles])
+    if all(profile["templates"] is first["templates"] for profile in profiles):
+        values = first["templates"][calendars - 1, :, columns.index(column)]  # (n_sites, n_days, 96)
+    else:
+        templates = np.stack([profile["templates"][..., columns.index(column)] for profile in profiles])
+        values = templates[np.arange(len(profiles))[:, None], calendars - 1]
+    if column == "Space heating":
+        months = _day_dates(year, len(first["calendar"]))[first_day:last_day].month - 1
+        values *= first["month_factor"][months][:, None]
+    normalisation = np.array([profile["normalisation"] for profile in profiles])[:, None, None]
+    energy = np.array([profile["energy_per_year_MWh"] for profile in profiles])[:, None, None]
+    values = (values / normalisation * energy).round(0)
+
+    # Shared noise stream, scaled and rounded per site
+    noise = first["noise"]
+    if noise is not None and (column in noise["columns"] or column == "Total"):
+        unit = _range_unit_noise(noise, first_day, last_day)
+        used = [noise["columns"].index(column)] if column != "Total" else range(len(noise["columns"]))
+        sigma = np.array([profile["noise"]["sigma"] for profile in profiles])[:, None, None]
+        for i in used:
+            values += (sigma * unit[..., i]).round(0)
+
+    offset = first_day * 96
+    values = values.reshape(len(profiles), -1)[:, first_step - offset:last_step - offset]
+    return pd.DataFrame(values.T, index=index[first_step:last_step])
+
+
+
+def save_compressed(profile, path):
+    """
+    Write a compressed profile to a .npz archive.
+    """
+    meta = {key: value for key, value in profile.items() if key not in {"templates", "calendar", "month_factor"}}
+    np.savez_compressed(
+        path,
+        templates=profile["templates"],
+        calendar=profile["calendar"],
+        month_factor=profile["month_factor"],
+        meta=np.array(json.dumps(meta)),
+    )
+
+
+def load_compressed(path):
+    """
+    Read a compressed profile written by save_compressed.
+    """
+    with np.load(path) as archive:
+        profile = json.loads(str(archive["meta"]))
+        if profile.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compressed profile version: {profile.get('format_version')}")
+        profile["templates"] = archive["templates"]
+        profile["calendar"] = archive["calendar"]
+        profile["month_factor"] = archive["month_factor"]
+    return profile
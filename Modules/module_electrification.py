@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+
+from Modules import module_1, module_compress
+
+
+THERMAL_BANDS = list(module_1.THERMAL_RENAME.values())
+
+# COP = a + b * dT + c * dT**2, dT = sink - source temperature in K (Ruhnau et al. 2019 regressions)
+COP_COEFFICIENTS = {
+    "air": (6.08, -0.09, 0.0005),
+    "ground": (10.29, -0.21, 0.0012),
+}
+
+# Largest temperature lift (K) of the regression data; the quadratics turn upwards beyond it
+# (at 90 K for air, 87.5 K for ground source), so larger lifts continue the fit linearly
+COP_MAX_DELTA_T = 60.0
+
+# Default technology per band: heat pumps (sink temperature in °C) up to 100 °C, direct
+# electric heating (efficiency) above; pass your own conversion dict to change them
+DEFAULT_CONVERSION = {
+    "Space heating": {"sink_temperature": 40.0, "source": "air"},
+    "Hot water": {"sink_temperature": 60.0, "source": "air"},
+    "< 100 °C": {"sink_temperature": 95.0, "source": "air"},
+    "100 °C - 500 °C": {"efficiency": 0.99},
+    "500 °C - 1000 °C": {"efficiency": 0.9},
+    ">1000 °C": {"efficiency": 0.8},
+}
+
+ELECTRIFICATION_COLUMNS = [
+    "heat_MWh",
+    "electrified_heat_MWh",
+    "added_electricity_MWh",
+    "electricity_MWh",
+    "peak_kW",
+    "new_peak_kW",
+]
+
+
+
+def align_temperature(temperature, index):
+    """
+    Ambient temperature (°C) at every timestamp of index, shape (n_steps,).
+
+    temperature is a scalar or a Series with a DatetimeIndex (e.g. hourly values from
+    module_accounting.read_time_series); it is interpolated in time and held after its
+    last value.
+    """
+    if np.isscalar(temperature):
+        return np.full(len(index), float(temperature))
+
+    series = temperature.sort_index().astype(float)
+    values = series.reindex(series.index.union(index)).interpolate(method="time").reindex(index).to_numpy()
+    if np.isnan(values).any():
+        raise ValueError("The temperature series does not cover the whole profile period.")
+    return values
+
+
+def conversion_factors(temperature, index, conversion=None):
+    """
+    Electric power per unit of heat for every time step and thermal band, shape (n_steps, n_bands).
+
+    Heat pump bands (conversion entries with a sink_temperature and a COP source or explicit
+    cop_coefficients) get 1 / COP(t) from the ambient temperature, with the COP kept at 1 or
+    above. The regressions are fitted up to a temperature lift sink - ambient of
+    COP_MAX_DELTA_T (60 K, or a max_delta_t of the entry); above it the COP continues along
+    the tangent of the fit at that lift, so it keeps falling with the lift instead of rising
+    again, e.g. for the "< 100 °C" band with a 95 °C sink. Direct electric bands (an
+    efficiency) get 1 / efficiency. All bands and steps are evaluated at once.
+    """
+    conversion = {**DEFAULT_CONVERSION, **(conversion or {})}
+    ambient = align_temperature(temperature, index)[:, None]
+
+    heat_pump = np.array(["sink_temperature" in conversion[band] for band in THERMAL_BANDS])
+    sink = np.array([conversion[band].get("sink_temperature", np.nan) for band in THERMAL_BANDS])
+    coefficients = np.array(
+        [
+            conversion[band].get("cop_coefficients", COP_COEFFICIENTS[conversion[band].get("source", "air")])
+            for band in THERMAL_BANDS
+        ]
+    )
+    efficiency = np.array([conversion[band].get("efficiency", 1.0) for band in THERMAL_BANDS])
+    max_delta = np.array([conversion[band].get("max_delta_t", COP_MAX_DELTA_T) for band in THERMAL_BANDS])
+
+    a, b, c = coefficients.T
+    delta = sink[None, :] - ambient
+    fitted = np.minimum(delta, max_delta)
+    slope = b + 2 * c * max_delta  # dCOP/dT at the largest fitted lift
+    cop = a + b * fitted + c * fitted ** 2 + slope * np.maximum(delta - max_delta, 0)
+    return np.where(heat_pump, 1 / np.maximum(np.nan_to_num(cop, nan=1.0), 1.0), 1 / efficiency)
+
+
+def electrified_load(heat, factors, shares):
+    """
+    Additional electric load of electrifying shares of the thermal bands.
+
+    heat has shape (n_sites, n_steps, n_bands) in kW, factors (n_steps, n_bands) from
+    conversion_factors and shares (n_scenarios, n_bands) the electrified share of each band.
+    The conversion is one matrix product over the bands. Returns an array of shape
+    (n_sites, n_scenarios, n_steps) in kW.
+    """
+    electric = np.asarray(heat, dtype=float) * factors  # Electric power if a band were fully electrified
+    return np.swapaxes(electric @ np.asarray(shares, dtype=float).T, -1, -2)
+
+
+
+def _share_matrix(scenarios):
+    """
+    Scenario x band share matrix with the scenario labels; None electrifies every band fully.
+    """
+    if scenarios is None:
+        return np.ones((1, len(THERMAL_BANDS))), ["full"]
+    if isinstance(scenarios, dict):
+        scenarios = pd.DataFrame([scenarios], index=["electrified"])
+    scenarios = scenarios.rename(columns=module_1.THERMAL_RENAME)
+    unknown = [column for column in scenarios.columns if column not in THERMAL_BANDS]
+    if unknown:
+        raise KeyError(f"Unknown thermal bands: {', '.join(map(str, unknown))}.")
+    return scenarios.reindex(columns=THERMAL_BANDS, fill_value=0).to_numpy(dtype=float), list(scenarios.index)
+
+
+def _site_profiles(industry_number, year, base_path, seed):
+    """
+    Thermal and electrical profile of one industry and year, decoded from compressed form.
+    """
+    thermal = module_compress.decode_profile(
+        module_compress.compress_profile(industry_number, year, base_path=base_path, carrier="thermal")
+    )
+    electrical = module_compress.decode_profile(
+        module_compress.compress_profile(industry_number, year, base_path=base_path, carrier="electrical", seed=seed)
+    )
+    return thermal, electrical
+
+
+def electrify_profile(industry_number, year, temperature, shares=None, conversion=None, base_path="", seed=None):
+    """
+    Electrical profile of an industry with part of its heat demand electrified.
+
+    shares maps thermal bands to electrified shares (None electrifies every band), temperature
+    is the ambient temperature for the heat pump COP (see align_temperature) and conversion
+    overrides DEFAULT_CONVERSION per band. The thermal and electrical profiles of the same
+    industry and year are generated in memory (module_compress, fluctuations if a seed is
+    given). Returns the electrical profile with one "Electrified <band>" column per band
+    and the Total including them.
+    """
+    thermal, electrical = _site_profiles(industry_number, year, base_path, seed)
+    matrix, _ = _share_matrix(shares)
+
+    factors = conversion_factors(temperature, thermal.index, conversion)
+    added = thermal[THERMAL_BANDS].to_numpy() * factors * matrix[0]  # (n_steps, n_bands)
+
+    df = electrical.copy()
+    for i, band in enumerate(THERMAL_BANDS):
+        df[f"Electrified {band}"] = added[:, i]
+    df["Total"] = electrical["Total"] + added.sum(axis=1)
+    return df[[column for column in df.columns if column != "Total"] + ["Total"]]
+
+
+def electrify(industry_numbers, year, temperature, scenarios=None, conversion=None, base_path="", seed=None,
+              return_totals=False):
+    """
+    Electrification scenarios for many industries in one pass.
+
+    scenarios is a DataFrame with one row per scenario and one electrified share per thermal
+    band (or a dict for a single scenario; None electrifies every band). The conversion
+    factors are computed once for all bands and steps, and the added load of every industry
+    and scenario follows from one matrix product (electrified_load).
+
+    Returns a summary DataFrame indexed by (industry_number, scenario) with the
+    ELECTRIFICATION_COLUMNS, and with return_totals also the new electrical Total of every
+    industry and scenario as an array of shape (n_industries, n_scenarios, n_steps).
+    """
+    matrix, labels = _share_matrix(scenarios)
+    profiles = [_site_profiles(industry_number, year, base_path, seed) for industry_number in industry_numbers]
+
+    index = profiles[0][0].index
+    heat = np.stack([thermal[THERMAL_BANDS].to_numpy() for thermal, _ in profiles])  # (n_sites, n_steps, n_bands)
+    electric = np.stack([electrical["Total"].to_numpy() for _, electrical in profiles])  # (n_sites, n_steps)
+
+    added = electrified_load(heat, conversion_factors(temperature, index, conversion), matrix)
+    totals = electric[:, None, :] + added
+
+    to_mwh = 0.25 / 1000  # kW per 15 min step to MWh
+    summary = pd.DataFrame(
+        {
+            "heat_MWh": np.repeat(heat.sum(axis=(1, 2)) * to_mwh, len(labels)),
+            "electrified_heat_MWh": (heat.sum(axis=1) @ matrix.T).ravel() * to_mwh,
+            "added_electricity_MWh": added.sum(axis=-1).ravel() * to_mwh,
+            "electricity_MWh": totals.sum(axis=-1).ravel() * to_mwh,
+            "peak_kW": np.repeat(electric.max(axis=-1), len(labels)),
+            "new_peak_kW": totals.max(axis=-1).ravel(),
+        },
+        index=pd.MultiIndex.from_product([list(industry_numbers), labels], names=["industry_number", "scenario"]),
+        columns=ELECTRIFICATION_COLUMNS,
+    )
+
+    if return_totals:
+        return summary, totals
+    return summary
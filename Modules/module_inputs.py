@@ -0,0 +1,304 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from Modules import module_catalog
+
+
+# Candidate locations of the input workbooks relative to the project root (first match wins)
+INPUT_FILES = {
+    "electrical_profiles": [
+        Path("ElectricalProfile") / "data" / "Load_profiles_enduser.xlsx",
+        Path("Electrical") / "Load_profiles_enduser.xlsx",
+    ],
+    "electrical_industry": [
+        Path("ElectricalProfile") / "data" / "All_info_industry_types_electrical.xlsx",
+        Path("Electrical") / "All_info_industry_types_electrical.xlsx",
+    ],
+    "thermal_profiles": [
+        Path("ThermalProfile") / "data" / "Load_profiles_daytypes.xlsx",
+        Path("Thermal") / "Load_profiles_daytypes.xlsx",
+    ],
+    "thermal_industry": [
+        Path("ThermalProfile") / "data" / "All_info_industry_types_thermal.xlsx",
+        Path("Thermal") / "All_info_industry_types_thermal.xlsx",
+    ],
+    "hdd": [
+        Path("HeatingDegreeDays.xlsx"),
+        Path("ElectricalProfile") / "data" / "HeatingDegreeDays.xlsx",
+        Path("ThermalProfile") / "data" / "HeatingDegreeDays.xlsx",
+        Path("data") / "HeatingDegreeDays.xlsx",
+    ],
+}
+
+# pd.read_excel arguments per workbook (profile sheets are indexed by their time column)
+_READ_OPTIONS = {
+    "electrical_profiles": {"index_col": 0},
+    "thermal_profiles": {"index_col": 0},
+}
+
+CARRIERS = ["electrical", "thermal"]
+
+# Workbooks read together on first use of a carrier
+_CARRIER_INPUTS = {carrier: [f"{carrier}_profiles", f"{carrier}_industry"] for carrier in CARRIERS}
+
+
+
+def resolve_project_root(base_path):
+    """
+    Project root for a base path, which may also point to a carrier folder or its data folder.
+    """
+    if base_path:
+        path = Path(base_path)
+    else:
+        path = Path(__file__).resolve().parent.parent
+
+    name = path.name.lower()
+    if name in {"electricalprofile", "thermalprofile"}:
+        return path.parent
+    if name == "data" and path.parent.name.lower() in {"electricalprofile", "thermalprofile"}:
+        return path.parent.parent
+
+    return path
+
+
+def resolve_existing_path(candidates):
+    for candidate in candidates:
+        if candidate.exists():
+            return candidate
+    raise FileNotFoundError(
+        "None of the expected data files exist: " + ", ".join(str(c) for c in candidates)
+    )
+
+
+def resolve_input_path(name, base_path):
+    """
+    Locate one input workbook (a key of INPUT_FILES) without reading it.
+    """
+    project_root = resolve_project_root(base_path)
+    return resolve_existing_path([project_root / candidate for candidate in INPUT_FILES[name]])
+
+
+
+def _read_only(df):
+    """
+    Copy of a DataFrame backed by non-writeable arrays, so shared tables cannot be changed in place.
+    """
+    arrays = {}
+    for position in range(df.shape[1]):
+        values = df.iloc[:, position].to_numpy().copy()
+        values.flags.writeable = False
+        arrays[position] = values
+    frozen = pd.DataFrame(arrays, index=df.index, copy=False)
+    frozen.columns = df.columns
+    return frozen
+
+
+def _normalize_electric_profile_columns(df):
+    df = df.copy()
+
+    if "Continuous mechanical drive" in df.columns or "Discontinuous mechanical drive" in df.columns:
+        cont = df["Continuous mechanical drive"] if "Continuous mechanical drive" in df.columns else 0
+        disc = df["Discontinuous mechanical drive"] if "Discontinuous mechanical drive" in df.columns else 0
+        df["Mechanical drives"] = cont + disc
+        df = df.drop(columns=[c for c in ["Continuous mechanical drive", "Discontinuous mechanical drive"] if c in df.columns])
+
+    if "Mechanical drive" in df.columns and "Mechanical drives" not in df.columns:
+        df = df.rename(columns={"Mechanical drive": "Mechanical drives"})
+
+    return df
+
+
+def _clean_industry_table(df):
+    """
+    Drop empty rows/columns of an industry table and fill gaps with 0.
+    """
+    df = df.dropna(how="all", axis=0)
+    df = df.dropna(how="all", axis=1)
+    return df.fillna(0)
+
+
+
+class InputRepository:
+    """
+    All input workbooks of a project, each opened once and shared read-only by all modules.
+
+    The paths are resolved once, when the repository is created. A workbook is read on first
+    use, with all its sheets in a single open: the profile and industry workbooks of a
+    carrier together (concurrently), the HDD workbook on its own, so a run of one carrier
+    does not open the other carrier's files. The cleaning steps (empty rows, mechanical
+    drive columns, gaps in the industry tables) are applied once; the industry tables are
+    also indexed once as module_catalog.IndustryCatalog. Accessors return DataFrames
+    backed by non-writeable arrays; modules copy them before changing anything. Workbooks
+    that do not exist (e.g. a project with one carrier only) raise FileNotFoundError when
+    they are accessed.
+
+    Accessors do not check the files for changes; call refresh() after editing a workbook.
+    """
+
+    def __init__(self, base_path="", max_workers=None):
+        self.project_root = resolve_project_root(base_path)
+        self.max_workers = max_workers
+        self.paths = {}
+        self._missing = {}
+        for name, candidates in INPUT_FILES.items():
+            try:
+                self.paths[name] = resolve_existing_path([self.project_root / candidate for candidate in candidates])
+            except FileNotFoundError as error:
+                self._missing[name] = error
+
+        self.signature = {}
+        self._raw = {}
+        self._profiles = {}
+        self._industry = {}
+        self._catalogs = {}
+        self._month_factors = None
+        self._lock = threading.Lock()
+
+    def _read_workbook(self, name):
+        signature = self._stat(name)  # Taken before reading, so a change during the read is seen by refresh()
+        return signature, pd.read_excel(self.paths[name], sheet_name=None, **_READ_OPTIONS.get(name, {}))
+
+    def _stat(self, name):
+        stat = self.paths[name].stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self, names):
+        """
+        Read the workbooks among names that are not loaded yet, concurrently, and clean them.
+        """
+        if all(name in self._raw for name in names):
+            return
+        with self._lock:
+            pending = [name for name in names if name not in self._raw]
+            if not pending:
+                return
+            with ThreadPoolExecutor(max_workers=self.max_workers or len(pending)) as executor:
+                results = dict(zip(pending, executor.map(self._read_workbook, pending)))
+            for name, (signature, sheets) in results.items():
+                self._prepare(name, sheets)
+                self.signature[name] = signature
+                self._raw[name] = {sheet: _read_only(df) for sheet, df in sheets.items()}
+
+    def _prepare(self, name, sheets):
+        carrier, _, kind = name.partition("_")
+        if kind == "profiles":
+            if carrier == "electrical":
+                sheets = {sheet: _normalize_electric_profile_columns(df.dropna(axis=0)) for sheet, df in sheets.items()}
+            self._profiles[carrier] = {sheet: _read_only(df) for sheet, df in sheets.items()}
+        elif kind == "industry":
+            first_sheet = next(iter(sheets.values()))
+            self._industry[carrier] = _read_only(_clean_industry_table(first_sheet))
+            self._catalogs[carrier] = module_catalog.IndustryCatalog(self._industry[carrier])
+        elif name == "hdd":
+            month_factors = sheets["HDD"].iloc[0][1:13].to_numpy(dtype=float)  # 12 monthly factors
+            month_factors.flags.writeable = False
+            self._month_factors = month_factors
+
+    def _changed(self):
+        changed = []
+        for name, signature in self.signature.items():
+            try:
+                if self._stat(name) != signature:
+                    changed.append(name)
+            except FileNotFoundError:
+                changed.append(name)
+        return changed
+
+    def refresh(self):
+        """
+        Forget the workbooks changed since they were read, so they are read again on next use.
+
+        Returns the names of the changed workbooks.
+        """
+        with self._lock:
+            changed = self._changed()
+            for name in changed:
+                del self.signature[name], self._raw[name]
+        return changed
+
+    def _check(self, name):
+        if name in self._missing:
+            raise self._missing[name]
+        if name not in INPUT_FILES:
+            raise KeyError(f"Unknown input '{name}', expected one of {', '.join(INPUT_FILES)}.")
+
+    def path(self, name):
+        self._check(name)
+        return self.paths[name]
+
+    def sheets(self, name):
+        """
+        Sheets of a workbook as read, before cleaning (sheet name -> DataFrame).
+        """
+        self._check(name)
+        self._load([name])
+        return self._raw[name]
+
+    def _load_carrier(self, carrier, name):
+        self._check_carrier(carrier)
+        self._check(f"{carrier}_{name}")
+        self._load([input_name for input_name in _CARRIER_INPUTS[carrier] if input_name in self.paths])
+
+    def profile_sheets(self, carrier):
+        """
+        Cleaned day type sheets of the daily profile workbook of a carrier.
+        """
+        self._load_carrier(carrier, "profiles")
+        return self._profiles[carrier]
+
+    def industry_table(self, carrier):
+        """
+        Cleaned industry table of a carrier.
+        """
+        self._load_carrier(carrier, "industry")
+        return self._industry[carrier]
+
+    def industry_catalog(self, carrier):
+        """
+        Industry table of a carrier as an IndustryCatalog (typed columns indexed by industry_number).
+        """
+        self._load_carrier(carrier, "industry")
+        return self._catalogs[carrier]
+
+    def month_factors(self):
+        """
+        The 12 monthly heating degree day factors (January first).
+        """
+        self._check("hdd")
+        self._load(["hdd"])
+        return self._month_factors
+
+    @staticmethod
+    def _check_carrier(carrier):
+        if carrier not in CARRIERS:
+            raise ValueError(f"Unknown carrier '{carrier}', expected 'electrical' or 'thermal'.")
+
+
+
+_repositories = {}  # Resolved project root -> repository
+_repositories_by_path = {}  # base_path as passed -> repository, so roots are resolved once
+_repositories_lock = threading.Lock()
+
+
+def get_repository(base_path="", refresh=False):
+    """
+    Shared InputRepository of a project, created on first use.
+
+    The project root of a base_path is resolved once. The workbooks are not checked for
+    changes on every call; with refresh the changed ones are read again (InputRepository.refresh).
+    """
+    repository = _repositories_by_path.get(str(base_path))
+    if repository is None:
+        with _repositories_lock:
+            project_root = resolve_project_root(base_path)
+            repository = _repositories.get(project_root)
+            if repository is None:
+                repository = InputRepository(project_root)
+                _repositories[project_root] = repository
+            _repositories_by_path[str(base_path)] = repository
+    if refresh:
+        repository.refresh()
+    return repository
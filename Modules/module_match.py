@@ -0,0 +1,210 @@
+import numpy as np
+import pandas as pd
+
+from Modules import module_1, module_2, module_3
+
+
+LIBRARY_YEARS = [2018, 2019, 2020]
+
+METHODS = ["annual", "day_type"]
+METRICS = ["correlation", "rmse"]
+
+MATCH_COLUMNS = ["meter", "rank", "industry_number", "name", "year", "correlation", "rmse", "scale", "energy_MWh"]
+
+
+
+def build_library(carrier="electrical", industry_numbers=None, years=None, base_path=""):
+    """
+    Precompute the normalised Total shapes of every industry and year.
+
+    Each entry is the Total column after normalising_1000, i.e. the profile of an annual
+    consumption of 1000 MWh in kW, without fluctuations. The daily templates are built once
+    per industry (modules 1-2); each year then only needs its day type calendar, and the
+    annual normalisation follows from module_3.stack_annual_energy.
+
+    Returns a dict with the entry table "keys" (industry_number, name, year), the normalised
+    Total of every load type "day_types" (n_entries, 5, 96), the annual shapes per year
+    "shapes" ({year: (n_entries_of_year, n_steps)}) and the day type "calendars" per year.
+    """
+    catalog = module_1.read_industry_catalog(carrier, base_path)
+    industry_numbers = sorted(set(catalog.numbers.tolist())) if industry_numbers is None else list(industry_numbers)
+    years = LIBRARY_YEARS if years is None else [int(year) for year in years]
+    calendars = {year: np.asarray(module_3.build_load_type_calendar(year)[1], dtype=np.int8) for year in years}
+
+    keys = []
+    day_types = []
+    for industry_number in industry_numbers:
+        weekday_profiles, saturday_profiles, sunday_profiles, holiday_profiles, constant_profiles, _ = (
+            module_1.build_daily_profiles(carrier, industry_number, base_path)
+        )
+        stack, columns = module_3.stack_day_profiles(
+            weekday_profiles, saturday_profiles, sunday_profiles, holiday_profiles, constant_profiles
+        )
+        peak_factor, base_factor = module_2.read_peak_base_factors(catalog, industry_number)
+        templates = module_2.apply_peak_base_factors_batch(stack, columns, peak_factor, base_factor)
+        name = str(catalog.value(industry_number, "Name"))
+
+        for year in years:
+            energy_per_year = module_3.stack_annual_energy(calendars[year], templates, columns)
+            day_types.append(templates[..., columns.index("Total")] / (energy_per_year / 1000))
+            keys.append({"industry_number": int(industry_number), "name": name, "year": year})
+
+    keys = pd.DataFrame(keys, columns=["industry_number", "name", "year"])
+    day_types = np.stack(day_types)
+
+    # Annual shapes: gather each day of the year from its load type
+    shapes = {}
+    for year in years:
+        entries = np.flatnonzero(keys["year"].to_numpy() == year)
+        shapes[year] = day_types[entries][:, calendars[year] - 1].reshape(len(entries), -1)
+
+    return {"carrier": carrier, "keys": keys, "day_types": day_types, "shapes": shapes, "calendars": calendars}
+
+
+
+def _as_meter_frame(meters):
+    if isinstance(meters, pd.Series):
+        meters = meters.to_frame(meters.name if meters.name is not None else 0)
+    if not isinstance(meters.index, pd.DatetimeIndex):
+        raise TypeError("Meter data needs a DatetimeIndex.")
+    return meters.astype(float)
+
+
+def _annual_values(meters, library):
+    """
+    Meter values aligned to the 15-minute index of their year, shape (n_steps, n_meters).
+    """
+    years = meters.index.year.unique()
+    if len(years) != 1:
+        raise ValueError("Annual matching needs meter data within a single year; use method='day_type'.")
+    year = int(years[0])
+    if year not in library["shapes"]:
+        raise ValueError(f"The library has no shapes for {year}; rebuild it with that year or use method='day_type'.")
+
+    values = meters[~meters.index.duplicated()].reindex(module_3.quarter_hour_index(year)).to_numpy()
+    entries = np.flatnonzero(library["keys"]["year"].to_numpy() == year)
+    return values, library["shapes"][year], entries
+
+
+def _day_type_values(meters, library):
+    """
+    Mean meter profile per load type and time of day, shape (5 * 96, n_meters), with the
+    number of observations behind every value as weights.
+
+    The load type of each day comes from the calendar of its own year (module_3.load_type_codes),
+    so meter data from any year (or several) can be compared with the library templates. The
+    entries of one industry only differ in the annual normalisation of their year, so one
+    entry per industry is used: the library year closest to the most frequent meter year.
+    """
+    index = meters.index
+    codes = module_3.load_type_codes(index).astype(np.int64)
+    cells = (codes - 1) * 96 + np.asarray(index.hour * 4 + index.minute // 15)
+
+    values = meters.to_numpy()
+    observed = ~np.isnan(values)
+    order = np.argsort(cells, kind="stable")
+    present, starts = np.unique(cells[order], return_index=True)
+
+    sums = np.zeros((5 * 96, values.shape[1]))
+    counts = np.zeros((5 * 96, values.shape[1]))
+    sums[present] = np.add.reduceat(np.where(observed, values, 0)[order], starts, axis=0)
+    counts[present] = np.add.reduceat(observed[order].astype(float), starts, axis=0)
+
+    means = np.divide(sums, counts, out=np.full_like(sums, np.nan), where=counts > 0)
+
+    keys = library["keys"]
+    meter_year = pd.Series(index.year).mode().iloc[0]
+    distance = (keys["year"] - meter_year).abs()
+    entries = np.sort(distance.groupby(keys["industry_number"], sort=False).idxmin().to_numpy())
+    shapes = library["day_types"][entries].reshape(len(entries), -1)
+    return means, shapes, entries, counts
+
+
+
+def _weighted_scores(values, weights, shapes):
+    """
+    Correlation, scale fit and RMSE of every meter against every library shape.
+
+    values and weights have shape (n_steps, n_meters), shapes (n_entries, n_steps). Missing
+    values carry a weight of 0. The scale is the least squares factor a minimising
+    |meter - a * shape|, so all scores follow from a handful of matrix products over the
+    observed steps. Returns three arrays of shape (n_meters, n_entries).
+    """
+    values = np.where(weights > 0, values, 0.0)
+    weighted = weights * values
+
+    n = weights.sum(axis=0)[:, None]
+    sum_x = weighted.sum(axis=0)[:, None]
+    sum_xx = (weighted * values).sum(axis=0)[:, None]
+    sum_s = weights.T @ shapes.T
+    sum_ss = weights.T @ (shapes * shapes).T
+    sum_xs = weighted.T @ shapes.T
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sum_xs - sum_x * sum_s / n
+        var_x = sum_xx - sum_x ** 2 / n
+        var_s = sum_ss - sum_s ** 2 / n
+        correlation = cov / np.sqrt(var_x * var_s)
+        scale = sum_xs / sum_ss
+        rmse = np.sqrt(np.maximum(sum_xx - sum_xs * scale, 0) / n)
+
+    return correlation, scale, rmse
+
+
+def match_meters(meters, library, method="annual", metric="correlation", top=5, chunk_size=256):
+    """
+    Rank the library entries that best explain each meter series.
+
+    meters is a DataFrame of 15-minute power values in kW with a DatetimeIndex and one column
+    per meter (or a Series for a single meter); missing values are NaN and ignored. With
+    method="annual" the meters are compared step by step with the shapes of their year,
+    with method="day_type" their mean profile per load type and time of day is compared with
+    the library templates, once per industry, which also works for years outside the library
+    and for short or gappy records. Meters are scored against the whole library in chunks
+    of chunk_size.
+
+    Entries are ranked by metric ("correlation", descending, or "rmse" after the scale fit,
+    ascending). Returns a DataFrame with the top matches per meter, their scores, the fitted
+    scale and the implied annual consumption energy_MWh (the shapes represent 1000 MWh).
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}', expected one of {', '.join(METHODS)}.")
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}', expected one of {', '.join(METRICS)}.")
+
+    meters = _as_meter_frame(meters)
+    keys = library["keys"]
+    top = min(top, len(keys))
+    results = []
+
+    for start in range(0, meters.shape[1], chunk_size):
+        chunk = meters.iloc[:, start:start + chunk_size]
+        if method == "annual":
+            values, shapes, entries = _annual_values(chunk, library)
+            weights = (~np.isnan(values)).astype(float)
+        else:
+            values, shapes, entries, weights = _day_type_values(chunk, library)
+        correlation, scale, rmse = _weighted_scores(values, weights, shapes)
+
+        # NaN scores (e.g. meters without data) are sorted last
+        order = np.argsort(-correlation if metric == "correlation" else rmse, axis=1)[:, :min(top, len(entries))]
+        rows = np.arange(len(order))[:, None]
+        selected = keys.iloc[entries[order].ravel()]
+        results.append(
+            pd.DataFrame(
+                {
+                    "meter": np.repeat(chunk.columns.to_numpy(), order.shape[1]),
+                    "rank": np.tile(np.arange(1, order.shape[1] + 1), len(order)),
+                    "industry_number": selected["industry_number"].to_numpy(),
+                    "name": selected["name"].to_numpy(),
+                    "year": selected["year"].to_numpy(),
+                    "correlation": correlation[rows, order].ravel(),
+                    "rmse": rmse[rows, order].ravel(),
+                    "scale": scale[rows, order].ravel(),
+                    "energy_MWh": scale[rows, order].ravel() * 1000,
+                },
+                columns=MATCH_COLUMNS,
+            )
+        )
+
+    return pd.concat(results, ignore_index=True)
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+from Modules import module_1, module_2, module_3, module_compress, module_inputs
+
+
+# Stack order of the day type sheets (load types 1-4; type 5, constant load, is all ones)
+_SHEET_ORDER = ["Week_day", "Holiday", "Saturday", "Sunday"]
+
+# Industry number of compressed profiles built from a custom mix
+CUSTOM_MIX = 0
+
+
+
+def base_end_use_stack(carrier="electrical", base_path=""):
+    """
+    Unweighted end-use profiles of a carrier stacked by load type, shape (5, 96, n_applications).
+
+    Electrical applications have their own profiles; the thermal temperature bands all follow
+    the single thermal profile of each day type, as in module_1. Returns the stack and the
+    application names.
+    """
+    sheets = module_inputs.get_repository(base_path).profile_sheets(carrier)
+    if carrier == "electrical":
+        applications = list(sheets["Week_day"].columns)
+        days = [sheets[name][applications].to_numpy(dtype=float) for name in _SHEET_ORDER]
+    else:
+        applications = list(module_1.THERMAL_RENAME.values())
+        days = [np.repeat(sheets[name].to_numpy(dtype=float)[:, :1], len(applications), axis=1) for name in _SHEET_ORDER]
+    days.append(np.ones_like(days[0]))  # Constant load
+    return np.stack(days), applications
+
+
+def _weight_matrix(weights, applications):
+    """
+    Site x application weight matrix in the order of applications, with the site labels.
+
+    DataFrame columns are matched by name (missing applications get weight 0; the
+    workbook names "Mechanical drive" and the German thermal names are accepted).
+    """
+    if isinstance(weights, pd.DataFrame):
+        weights = weights.rename(columns={"Mechanical drive": "Mechanical drives", **module_1.THERMAL_RENAME})
+        unknown = [column for column in weights.columns if column not in applications]
+        if unknown:
+            raise KeyError(f"Unknown applications in the weights: {', '.join(map(str, unknown))}.")
+        return weights.reindex(columns=applications, fill_value=0).to_numpy(dtype=float), list(weights.index)
+
+    matrix = np.atleast_2d(np.asarray(weights, dtype=float))
+    if matrix.shape[-1] != len(applications):
+        raise ValueError(f"Weights need one column per application ({', '.join(applications)}).")
+    return matrix, list(range(len(matrix)))
+
+
+def mix_templates(weights, stack):
+    """
+    Daily profiles of every site from a site x application weight matrix.
+
+    weights has shape (n_sites, n_applications) and stack is base_end_use_stack(). The
+    application columns are the base profiles scaled by the weights; the Total of all sites
+    and day types is one matrix product of the weights with the base profiles. Returns
+    an array of shape (n_sites, 5, 96, n_applications + 1), Total last.
+    """
+    weights = np.asarray(weights, dtype=float)
+    n_applications = stack.shape[-1]
+    total = (weights @ stack.reshape(-1, n_applications).T).reshape(len(weights), *stack.shape[:2])
+    applications = stack[None] * weights[:, None, None, :]
+    return np.concatenate([applications, total[..., None]], axis=-1)
+
+
+
+def mix_profiles(weights, year, energy_per_year_MWh, carrier="electrical", peak_factor=0.0, base_factor=0.0,
+                 base_path="", calendars=None, seed=None, fluctuation=0.0, noise_model=None,
+                 noise_columns=("Mechanical drives",)):
+    """
+    Compressed annual profiles of sites defined by their own application mix.
+
+    weights is a site x application matrix (DataFrame with application columns, or an array
+    in the order of base_end_use_stack), e.g. the application shares of a measured site.
+    energy_per_year_MWh, peak_factor and base_factor (workbook-style values, 0 keeps the
+    profile's own peak and base) and fluctuation are scalars or one value per site. calendars
+    optionally holds one load type calendar per site (module_3.site_calendars).
+
+    The daily templates of all sites come from one batched matrix product (mix_templates)
+    and are rescaled in one call of module_2.apply_peak_base_factors_batch; normalisation,
+    seasonality and scaling are stored per site in compressed form, so
+    module_compress.decode_sites decodes any column of all sites in one gather. Returns a
+    dict mapping the site labels (DataFrame index or row numbers) to compressed profiles.
+    """
+    stack, applications = base_end_use_stack(carrier, base_path)
+    matrix, sites = _weight_matrix(weights, applications)
+    columns = applications + ["Total"]
+
+    templates = mix_templates(matrix, stack)
+    n_sites = len(sites)
+    peak_factor, base_factor, energy, fluctuation = (
+        np.broadcast_to(np.asarray(value, dtype=float), (n_sites,))
+        for value in (peak_factor, base_factor, energy_per_year_MWh, fluctuation)
+    )
+    adjusted = module_2.apply_peak_base_factors_batch(templates, columns, peak_factor, base_factor)
+
+    if calendars is None:
+        calendar = np.asarray(module_3.build_load_type_calendar(year)[1], dtype=np.int8)
+        calendars = np.broadcast_to(calendar, (n_sites, len(calendar)))
+    month_factor = module_3.read_month_factors(base_path)
+
+    return {
+        site: module_compress.build_compressed(
+            carrier,
+            CUSTOM_MIX,
+            year,
+            adjusted[i],
+            columns,
+            calendars[i],
+            month_factor,
+            energy[i],
+            seed=seed,
+            fluctuation=fluctuation[i],
+            noise_columns=noise_columns,
+            noise_model=noise_model,
+        )
+        for i, site in enumerate(sites)
+    }
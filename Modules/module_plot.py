@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from pathlib import Path
 
+import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
@@ -129,6 +130,126 @@ def _plot_stack(x_labels, y_stack, labels, colors, xtick, title=None, y_max=None
 
 
 
+def _minmax_indices(total, n_buckets):
+    """
+    Indices of the minimum and maximum of each bucket, in time order.
+
+    Decimating every series at the same timesteps keeps the stack consistent while
+    preserving the peaks and troughs of the total at about two points per pixel column.
+    """
+    n = len(total)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+    size = -(-n // n_buckets)
+    padded = np.full(size * n_buckets, np.nan)
+    padded[:n] = total
+    buckets = padded.reshape(n_buckets, size)
+    valid = ~np.all(np.isnan(buckets), axis=1)
+    offsets = np.arange(n_buckets)[valid] * size
+    lows = offsets + np.nanargmin(buckets[valid], axis=1)
+    highs = offsets + np.nanargmax(buckets[valid], axis=1)
+    return np.unique(np.concatenate([lows, highs]))
+
+
+def _day_matrix(series):
+    """
+    Reshape a 15-minute series into a (days x 96) matrix, leaving missing steps as NaN.
+    """
+    index = series.index
+    days = (index.normalize() - index[0].normalize()).days
+    steps = index.hour * 4 + index.minute // 15
+    matrix = np.full((days.max() + 1, 96), np.nan)
+    matrix[days, steps] = series.to_numpy(dtype=float)
+    return matrix
+
+
+def _plot_overview(df, labels, colors, title=None, width=1200):
+    """
+    Render a decimated stacked area plot of the whole profile with a date axis.
+    """
+    total = df[labels].sum(axis=1).to_numpy()
+    keep = _minmax_indices(total, width // 2)
+    x = mdates.date2num(df.index[keep].to_pydatetime())
+    y_stack = _build_stack(df.iloc[keep], labels)
+
+    fig, ax = plt.subplots(figsize=(12, 4))
+    ax.stackplot(x, y_stack, labels=labels, colors=colors, linewidth=0)
+
+    ax.set_xlabel("Time", fontsize=12)
+    ax.set_ylabel("Power in kW", fontsize=12)
+    locator = mdates.AutoDateLocator()
+    ax.xaxis.set_major_locator(locator)
+    ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+    ax.tick_params(labelsize=10)
+
+    if title:
+        ax.set_title(title, fontsize=12)
+
+    handles, legend_labels = ax.get_legend_handles_labels()
+    ax.legend(list(reversed(handles)), list(reversed(legend_labels)), loc="upper right", fontsize=9)
+    ax.set_xlim(x[0], x[-1])
+    if y_stack.size:
+        ax.set_ylim(bottom=0, top=np.nanmax(np.sum(y_stack, axis=0)) * 1.05)
+
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+
+    return fig
+
+
+def _plot_heatmaps(df, labels, title=None):
+    """
+    Render one day x time-of-day heatmap per application, each drawn as a single image.
+    """
+    n_cols = 3
+    n_rows = -(-len(labels) // n_cols)
+    fig, axes = plt.subplots(n_rows, n_cols, figsize=(15, 3.2 * n_rows), squeeze=False, sharex=True,
+                             layout="constrained")
+
+    first_day = mdates.date2num(df.index[0].normalize().to_pydatetime())
+    for ax, label in zip(axes.flat, labels):
+        matrix = _day_matrix(df[label])
+        image = ax.imshow(
+            matrix.T,
+            aspect="auto",
+            origin="lower",
+            interpolation="nearest",
+            cmap="viridis",
+            extent=(first_day, first_day + matrix.shape[0], 0, 24),
+        )
+        fig.colorbar(image, ax=ax, label="kW")
+        ax.set_title(label, fontsize=11)
+        ax.set_ylabel("Hour of day", fontsize=10)
+        ax.set_yticks([0, 6, 12, 18, 24])
+        locator = mdates.AutoDateLocator()
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        ax.tick_params(labelsize=9)
+
+    for ax in list(axes.flat)[len(labels):]:
+        ax.set_visible(False)
+
+    if title:
+        fig.suptitle(title, fontsize=12)
+
+    return fig
+
+
+def _save_figure(fig, base_path, file_name, show):
+    """
+    Save a figure to Generated/diagrams and close it unless it should be shown.
+    """
+    output_path = Path(base_path) / "Generated" / "diagrams" / file_name
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(output_path, bbox_inches="tight")
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
+    return output_path
+
+
+
 def day_electrical(df):
     """
     Plot a single-day electrical profile (96 time steps).
@@ -205,3 +326,48 @@ def year_thermal(df, industry_name, industry_type, base_path):
     output_path = base_path / "Generated" / "diagrams" / f"{industry_name}_Diagram.png"
     fig.savefig(output_path, bbox_inches="tight")
     plt.show()
+
+
+
+def overview_electrical(df, industry_name, industry_type, base_path, width=1200, show=False):
+    """
+    Plot and save a decimated full-year stacked electrical overview that keeps the peaks.
+    """
+    df = _flatten_columns(df)
+    _require_columns(df, ELECTRIC_LABELS)
+
+    fig = _plot_overview(df, ELECTRIC_LABELS, ELECTRIC_COLORS, title=f"WZ08 {industry_type} {industry_name}", width=width)
+    return _save_figure(fig, base_path, f"{industry_name}_Overview.png", show)
+
+
+def overview_thermal(df, industry_name, industry_type, base_path, width=1200, show=False):
+    """
+    Plot and save a decimated full-year stacked thermal overview that keeps the peaks.
+    """
+    df = _flatten_columns(df)
+    _require_columns(df, THERMAL_LABELS)
+
+    fig = _plot_overview(df, THERMAL_LABELS, THERMAL_COLORS, title=f"WZ08 {industry_type} {industry_name}", width=width)
+    return _save_figure(fig, base_path, f"{industry_name}_Overview.png", show)
+
+
+def heatmap_electrical(df, industry_name, industry_type, base_path, show=False):
+    """
+    Plot and save day x time-of-day heatmaps of every electrical application and the total.
+    """
+    df = _flatten_columns(df)
+    _require_columns(df, ELECTRIC_LABELS + ["Total"])
+
+    fig = _plot_heatmaps(df, ELECTRIC_LABELS + ["Total"], title=f"WZ08 {industry_type} {industry_name}")
+    return _save_figure(fig, base_path, f"{industry_name}_Heatmap.png", show)
+
+
+def heatmap_thermal(df, industry_name, industry_type, base_path, show=False):
+    """
+    Plot and save day x time-of-day heatmaps of every thermal application and the total.
+    """
+    df = _flatten_columns(df)
+    _require_columns(df, THERMAL_LABELS + ["Total"])
+
+    fig = _plot_heatmaps(df, THERMAL_LABELS + ["Total"], title=f"WZ08 {industry_type} {industry_name}")
+    return _save_figure(fig, base_path, f"{industry_name}_Heatmap.png", show)
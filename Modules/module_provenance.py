@@ -0,0 +1,135 @@
+import datetime
+import hashlib
+import json
+from pathlib import Path
+
+
+from Modules import module_1, module_inputs
+
+
+PROVENANCE_SUFFIX = ".provenance.json"
+
+# Sources whose code determines the generated values, relative to the project root (the runners
+# scale and add fluctuations themselves, module_rollup writes the rollup sheets)
+PIPELINE_SOURCES = [
+    Path("Modules") / "module_inputs.py",
+    Path("Modules") / "module_catalog.py",
+    Path("Modules") / "module_1.py",
+    Path("Modules") / "module_2.py",
+    Path("Modules") / "module_3.py",
+    Path("Modules") / "module_4.py",
+    Path("Modules") / "module_compress.py",
+    Path("Modules") / "module_rollup.py",
+    Path("ElectricalProfile") / "LoadGeneratorElectricity.py",
+    Path("ThermalProfile") / "LoadGeneratorThermal.py",
+]
+
+
+
+def _hash_text(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _hash_frame(df, index=True):
+    """
+    Content hash of a DataFrame including its column labels.
+    """
+    return _hash_text(df.to_csv(index=index))
+
+
+def code_version():
+    """
+    Hash of the pipeline sources, so outputs are rebuilt when the generating code changes.
+    """
+    project_root = Path(__file__).resolve().parent.parent
+    return _hash_text("".join((project_root / path).read_text(encoding="utf-8") for path in PIPELINE_SOURCES))
+
+
+
+def read_input_tables(carrier, base_path=""):
+    """
+    Inputs of a carrier as read from the workbooks: industry catalog, day type template sheets
+    and HDD sheet (shared through module_inputs.get_repository).
+    """
+    repository = module_inputs.get_repository(base_path, refresh=True)  # Provenance must see edited workbooks
+    sheets = repository.sheets(f"{carrier}_profiles")
+    return {
+        "industry": repository.industry_catalog(carrier),
+        "sheets": {name: sheets[name] for name in module_1.DAY_TYPE_SHEETS},
+        "hdd": repository.sheets("hdd")["HDD"],
+    }
+
+
+def input_hashes(carrier, industry_number, year, base_path="", tables=None):
+    """
+    Provenance of one profile: hashes of the exact inputs it is generated from.
+
+    Covers the industry row, every day type template sheet, the HDD factor row, the year and
+    the code version. Pass tables from read_input_tables to hash many profiles without
+    re-reading the workbooks.
+    """
+    tables = tables if tables is not None else read_input_tables(carrier, base_path)
+    if industry_number not in tables["industry"]:
+        raise KeyError(f"Industry number {industry_number} not found in the {carrier} industry table.")
+    row = tables["industry"].frame(industry_number)
+
+    return {
+        "carrier": carrier,
+        "industry_number": int(industry_number),
+        "year": int(year),
+        "industry_row": _hash_frame(row, index=False),
+        "template_sheets": {name: _hash_frame(sheet) for name, sheet in tables["sheets"].items()},
+        "hdd_row": _hash_frame(tables["hdd"].iloc[[0]], index=False),
+        "code_version": code_version(),
+    }
+
+
+def changed_inputs(recorded, current):
+    """
+    Names of the inputs whose hashes differ, e.g. ["industry_row", "template_sheets.Saturday"].
+    """
+    changed = []
+    for key in sorted(set(recorded) | set(current)):
+        old, new = recorded.get(key), current.get(key)
+        if isinstance(old, dict) and isinstance(new, dict):
+            changed += [f"{key}.{name}" for name in sorted(set(old) | set(new)) if old.get(name) != new.get(name)]
+        elif old != new:
+            changed.append(key)
+    return changed
+
+
+
+def provenance_path(output_path):
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.name + PROVENANCE_SUFFIX)
+
+
+def write_provenance(output_path, producer, inputs):
+    """
+    Store the provenance record of an output file next to it.
+
+    producer describes how to rebuild the output (e.g. runner arguments), inputs comes from
+    input_hashes.
+    """
+    record = {
+        "output": Path(output_path).name,
+        "producer": producer,
+        "inputs": inputs,
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+    provenance_path(output_path).write_text(json.dumps(record, indent=2, default=str), encoding="utf-8")
+    return record
+
+
+def read_provenance(output_path):
+    return json.loads(provenance_path(output_path).read_text(encoding="utf-8"))
+
+
+def find_provenance(directory):
+    """
+    Output paths in a directory that carry a provenance record.
+    """
+    return sorted(
+        path.with_name(path.name[: -len(PROVENANCE_SUFFIX)])
+        for path in Path(directory).glob(f"*{PROVENANCE_SUFFIX}")
+    )
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+from pandas.tseries import offsets
+from pandas.tseries.frequencies import to_offset
+
+
+# Pyramid levels from finest to coarsest with the pandas frequency of their periods
+LEVELS = {
+    "15min": "15min",
+    "hourly": "h",
+    "daily": "D",
+    "monthly": "MS",
+}
+
+STATISTICS = ["sum", "mean", "max"]  # sum: energy in kWh, mean and max: power in kW
+
+_CALENDAR_OFFSETS = {
+    "daily": (offsets.Week, offsets.MonthBegin, offsets.MonthEnd, offsets.QuarterBegin, offsets.QuarterEnd,
+              offsets.YearBegin, offsets.YearEnd),
+    "monthly": (offsets.MonthBegin, offsets.MonthEnd, offsets.QuarterBegin, offsets.QuarterEnd,
+                offsets.YearBegin, offsets.YearEnd),
+}
+
+
+
+def _flatten_columns(df):
+    """
+    Flatten MultiIndex columns (Application, Unit) to the application names.
+    """
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.copy()
+        df.columns = df.columns.get_level_values(0)
+    return df
+
+
+def _level_fits(level, freq, first, last):
+    """
+    Check whether a level can answer a query: the range must start and end on period
+    boundaries of the level and the requested periods must be unions of level periods.
+    """
+    level_freq = LEVELS[level]
+    after_last = last + pd.Timedelta(minutes=15)
+    if level_freq == "MS":
+        aligned = all(ts == ts.normalize() and ts.day == 1 for ts in (first, after_last))
+    else:
+        aligned = first == first.floor(level_freq) and after_last == after_last.floor(level_freq)
+    if not aligned:
+        return False
+
+    offset = to_offset(freq)
+    if isinstance(offset, offsets.Tick):
+        return level in {"15min", "hourly", "daily"} and offset.nanos % to_offset(level_freq).nanos == 0
+    return level == "15min" or level == "hourly" or isinstance(offset, _CALENDAR_OFFSETS[level])
+
+
+
+def build_pyramid(df, levels=None):
+    """
+    Precompute sum, mean and max per application for every pyramid level.
+
+    Returns a dict mapping level names ("15min", "hourly", "daily", "monthly", or only those
+    given in levels) to DataFrames indexed by period start with (Application, Statistic)
+    columns. Sums are energies in kWh, so each level can be rolled up further without going
+    back to the 15-minute data.
+    """
+    df = _flatten_columns(df).astype(float)
+    energy = df * 0.25  # 0.25 = 15 min intervals in hours
+
+    pyramid = {}
+    for level, freq in LEVELS.items():
+        if levels is not None and level not in levels:
+            continue
+        if level == "15min":
+            parts = {"sum": energy, "mean": df, "max": df}
+        else:
+            parts = {
+                "sum": energy.resample(freq).sum(),
+                "mean": df.resample(freq).mean(),
+                "max": df.resample(freq).max(),
+            }
+        rollup = pd.concat(parts, axis=1).swaplevel(0, 1, axis=1)
+        rollup = rollup.reindex(columns=pd.MultiIndex.from_product([df.columns, STATISTICS]))
+        rollup.columns.names = ["Application", "Statistic"]
+        rollup.index.name = "Time"
+        pyramid[level] = rollup
+
+    return pyramid
+
+
+def write_pyramid(writer, pyramid):
+    """
+    Write the aggregated pyramid levels as additional sheets of an open pd.ExcelWriter.
+    """
+    for level, rollup in pyramid.items():
+        if level != "15min":  # The 15-minute level is the profile sheet itself
+            rollup.to_excel(writer, sheet_name=level)
+
+
+def read_pyramid(path):
+    """
+    Read a pyramid from an output workbook written with rollups.
+    """
+    sheets = pd.read_excel(path, sheet_name=None, header=[0, 1], index_col=0)
+    profile = next(iter(sheets.values()))
+
+    # Levels missing from the workbook are rebuilt from the profile sheet
+    pyramid = build_pyramid(profile, levels=["15min"] + [level for level in LEVELS if level not in sheets])
+    for level in LEVELS:
+        if level in sheets and level != "15min":
+            rollup = sheets[level]
+            rollup.columns.names = ["Application", "Statistic"]
+            rollup.index.name = "Time"
+            pyramid[level] = rollup
+    return {level: pyramid[level] for level in LEVELS}
+
+
+
+def query(pyramid, start=None, end=None, freq="D", stat="sum", columns=None):
+    """
+    Answer a range and granularity request from the coarsest pyramid level that fits.
+
+    start and end follow pandas label slicing on the 15-minute index, freq is any pandas
+    frequency (e.g. "h", "D", "W", "MS") and stat one of "sum" (kWh), "mean" or "max" (kW).
+    Returns a DataFrame with one column per requested application.
+    """
+    if stat not in STATISTICS:
+        raise ValueError(f"Unknown statistic '{stat}', expected one of {', '.join(STATISTICS)}.")
+
+    base = pyramid["15min"].loc[start:end]
+    if base.empty:
+        raise KeyError(f"No data between {start} and {end}.")
+    first, last = base.index[0], base.index[-1]
+
+    level = next(
+        name for name in reversed(list(LEVELS)) if name in pyramid and _level_fits(name, freq, first, last)
+    )
+    data = pyramid[level].loc[first:last]
+    applications = list(dict.fromkeys(data.columns.get_level_values(0))) if columns is None else list(columns)
+
+    if to_offset(freq) == to_offset(LEVELS[level]):
+        return data.xs(stat, axis=1, level="Statistic")[applications]
+
+    # Roll the chosen level up to the requested frequency
+    if stat == "max":
+        return data.xs("max", axis=1, level="Statistic")[applications].resample(freq).max()
+
+    energy = data.xs("sum", axis=1, level="Statistic")[applications].resample(freq).sum()
+    if stat == "sum":
+        return energy
+    hours = pd.Series(0.25, index=base.index).resample(freq).sum()
+    return energy.div(hours.replace(0, np.nan), axis=0)
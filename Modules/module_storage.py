@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+
+STORAGE_COLUMNS = [
+    "original_peak_kW",
+    "peak_kW",
+    "peak_reduction_kW",
+    "charged_MWh",
+    "discharged_MWh",
+    "full_cycles",
+    "final_soc_kWh",
+]
+
+
+
+def _site_loads(loads):
+    """
+    Site load matrix (n_steps, n_sites) in kW from a DataFrame with one column per site, a
+    Series for one site, or a dict of profile DataFrames (their Total column is used).
+    """
+    if isinstance(loads, pd.Series):
+        loads = loads.to_frame(loads.name if loads.name is not None else 0)
+    elif isinstance(loads, dict):
+        totals = {}
+        for site, df in loads.items():
+            if isinstance(df.columns, pd.MultiIndex):
+                df = df.copy()
+                df.columns = df.columns.get_level_values(0)
+            totals[site] = df["Total"]
+        loads = pd.DataFrame(totals)
+    return loads.astype(float, copy=False)
+
+
+def _per_site(value, n_sites, name):
+    value = np.asarray(value, dtype=float)
+    if value.ndim == 0:
+        return np.full(n_sites, float(value))
+    if value.shape != (n_sites,):
+        raise ValueError(f"{name} needs one value or one value per site ({n_sites}).")
+    return value.copy()
+
+
+def simulate_peak_shaving(loads, capacity_kWh, power_kW, threshold_kW, charge_threshold_kW=None,
+                          efficiency=0.9, initial_soc=1.0, return_profiles=False, block_size=96):
+    """
+    Threshold-based battery dispatch for many sites at once.
+
+    Whenever a site's load exceeds threshold_kW the storage discharges to cut the excess,
+    limited by its power and state of charge; whenever the load is below charge_threshold_kW
+    (threshold_kW by default, capped at it) it recharges without pushing the load above that level.
+    efficiency is the round trip efficiency, split equally between charging and discharging,
+    initial_soc the initial state of charge as a fraction of capacity. Storage parameters
+    are scalars or arrays with one value per site.
+
+    Time is stepped once in 15-minute steps while every step is vectorized over the sites;
+    the loads are copied block_size steps at a time, so large portfolios are not duplicated
+    in memory.
+    Returns a DataFrame with one row per site (STORAGE_COLUMNS: original and resulting peak,
+    energy charged and discharged, equivalent full cycles and the final state of charge),
+    and with return_profiles also the resulting site loads.
+    """
+    loads = _site_loads(loads)
+    values = loads.to_numpy()
+    n_steps, n_sites = values.shape
+    dt = 0.25  # 15 min intervals in hours
+
+    capacity = _per_site(capacity_kWh, n_sites, "capacity_kWh")
+    power = _per_site(power_kW, n_sites, "power_kW")
+    threshold = _per_site(threshold_kW, n_sites, "threshold_kW")
+    charge_threshold = threshold if charge_threshold_kW is None else np.minimum(
+        _per_site(charge_threshold_kW, n_sites, "charge_threshold_kW"), threshold
+    )
+    efficiency_one_way = np.sqrt(_per_site(efficiency, n_sites, "efficiency"))
+    soc = capacity * _per_site(initial_soc, n_sites, "initial_soc")
+
+    net = np.empty((n_steps, n_sites)) if return_profiles else None  # Otherwise only the running peak is kept
+    peak = np.full(n_sites, -np.inf)
+    charged = np.zeros(n_sites)
+    discharged = np.zeros(n_sites)
+
+    for step in range(n_steps):
+        # Copy blocks of steps to contiguous memory instead of the whole (possibly column-major) matrix
+        if step % block_size == 0:
+            block = np.ascontiguousarray(values[step:step + block_size])
+        load = block[step % block_size]
+
+        # Discharge above the threshold, limited by power and the energy left
+        discharge = np.minimum(np.minimum(np.maximum(load - threshold, 0), power), soc * efficiency_one_way / dt)
+        # Recharge below the charging threshold, limited by power and the free capacity
+        charge = np.minimum(
+            np.minimum(np.maximum(charge_threshold - load, 0), power),
+            (capacity - soc) / (efficiency_one_way * dt),
+        )
+
+        soc += charge * efficiency_one_way * dt - discharge / efficiency_one_way * dt
+        charged += charge
+        discharged += discharge
+        net_load = load - discharge + charge
+        np.maximum(peak, net_load, out=peak)
+        if return_profiles:
+            net[step] = net_load
+
+    original_peak = values.max(axis=0) if n_steps else np.zeros(n_sites)
+    peak = peak if n_steps else np.zeros(n_sites)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        full_cycles = np.where(capacity > 0, discharged * dt / capacity, 0.0)
+
+    summary = pd.DataFrame(
+        {
+            "original_peak_kW": original_peak,
+            "peak_kW": peak,
+            "peak_reduction_kW": original_peak - peak,
+            "charged_MWh": charged * dt / 1000,
+            "discharged_MWh": discharged * dt / 1000,
+            "full_cycles": full_cycles,
+            "final_soc_kWh": soc,
+        },
+        index=loads.columns,
+        columns=STORAGE_COLUMNS,
+    )
+    summary.index.name = "site"
+
+    if return_profiles:
+        return summary, pd.DataFrame(net, index=loads.index, columns=loads.columns)
+    return summary
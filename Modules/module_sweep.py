@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+
+from Modules import module_1, module_2, module_3, module_4
+
+
+SUMMARY_COLUMNS = ["Peak_factor", "Base_factor", "Fluctuation", "peak_kW", "energy_MWh", "full_load_hours"]
+
+
+
+def _as_grid(values, default):
+    """
+    Turn a factor grid argument into a 1-D float array, using the industry value if None.
+    """
+    if values is None:
+        return np.array([default], dtype=float)
+    return np.atleast_1d(np.asarray(values, dtype=float))
+
+
+def _scenario_grid(peak_factors, base_factors, fluctuations):
+    """
+    Cartesian product of the three factor grids, flattened to one row per scenario.
+    """
+    peak, base, fluct = np.meshgrid(peak_factors, base_factors, fluctuations, indexing="ij")
+    return peak.ravel(), base.ravel(), fluct.ravel()
+
+
+def _scaled_totals(stack_total, peak_factor, base_factor, array_load_type, energy_per_year_MWh):
+    """
+    Normalised and upscaled Total of every day type for a batch of factor pairs.
+
+    Returns an array of shape (n_scenarios, 5, 96). The annual sum needed by normalising_1000
+    is taken from the day type counts, so the year is never assembled here.
+    """
+    adjusted = module_2.apply_peak_base_factors_batch(stack_total, ["Total"], peak_factor, base_factor)
+    energy_per_year = module_3.stack_annual_energy(array_load_type, adjusted, ["Total"])
+    normalized = adjusted[..., 0] / (energy_per_year / 1000)[:, None, None]
+    return (normalized * energy_per_year_MWh).round(0)
+
+
+
+def sweep_factors(industry_number, year, base_path="", carrier="electrical",
+                  peak_factors=None, base_factors=None, fluctuations=None,
+                  select=None, seed=None, chunk_size=256):
+    """
+    Evaluate a grid of Peak_factor / Base_factor / Fluctuation scenarios in one pass.
+
+    Each factor argument is a sequence of workbook-style values (None keeps the value of the
+    industry); the scenarios are the cartesian product of the three grids. The factors are
+    broadcast through the module 2 rescaling and the module 3/4 normalisation and scaling,
+    working on the five daily Total curves instead of the assembled year where possible.
+    Fluctuations are only added when a seed is given: they use one shared standard normal
+    draw (seeded by seed) scaled per scenario, so scenarios differ only by their factors and
+    repeated runs give the same summary. Without a seed the sweep is noiseless (the
+    Fluctuation default is 0) and non-zero fluctuations raise ValueError.
+
+    select is an optional callable receiving the summary DataFrame and returning a boolean
+    mask; full annual profiles are built only for the selected scenarios.
+
+    Returns the summary DataFrame (one row per scenario with peak, energy and full-load hours)
+    and a dict mapping the selected scenario numbers to their profile DataFrames.
+    """
+    weekday_profiles, saturday_profiles, sunday_profiles, holiday_profiles, constant_profiles, _ = (
+        module_1.build_daily_profiles(carrier, industry_number, base_path)
+    )
+    stack, columns = module_3.stack_day_profiles(
+        weekday_profiles, saturday_profiles, sunday_profiles, holiday_profiles, constant_profiles
+    )
+    stack_total = stack[..., [columns.index("Total")]]
+
+    year_list, array_load_type = module_3.build_load_type_calendar(year)
+    day_counts = np.bincount(np.asarray(array_load_type) - 1, minlength=5)
+    load_type = np.asarray(array_load_type) - 1
+
+    catalog = module_1.read_industry_catalog(carrier, base_path)
+    energy_per_year_MWh = module_4.read_energy_per_year(year, catalog, industry_number)
+
+    """ SCENARIO GRID """
+    peak_default, base_default = module_2.read_peak_base_factors(catalog, industry_number)
+    if carrier != "electrical" and fluctuations is not None:
+        raise ValueError("Fluctuations are only defined for electrical profiles.")
+    # Without a seed the sweep is noiseless, as in module_compress, so summaries are reproducible
+    if carrier == "electrical" and seed is not None:
+        fluct_default = float(catalog.value(industry_number, "Fluctuation"))
+    else:
+        fluct_default = 0.0
+
+    peak_grid = _as_grid(peak_factors, peak_default)
+    base_grid = _as_grid(base_factors, base_default)
+    fluct_grid = _as_grid(fluctuations, fluct_default)
+    if seed is None and np.any(fluct_grid != 0):
+        raise ValueError("Fluctuation scenarios need a seed, so the sweep is reproducible.")
+    peak_factor, base_factor, fluctuation = _scenario_grid(peak_grid, base_grid, fluct_grid)
+
+    # Scenarios sharing a peak/base pair share the adjusted curves; fluctuations vary fastest
+    pair_peak = peak_factor[::len(fluct_grid)]
+    pair_base = base_factor[::len(fluct_grid)]
+    n_fluct = len(fluct_grid)
+
+    noise = None
+    if np.any(fluct_grid != 0):
+        noise = np.random.default_rng(seed).standard_normal(len(load_type) * 96)
+
+    """ EVALUATE SCENARIOS IN CHUNKS OF PEAK/BASE PAIRS """
+    peak_kw = np.empty(len(peak_factor))
+    energy_mwh = np.empty(len(peak_factor))
+    present = day_counts > 0
+    pairs_per_chunk = max(1, chunk_size // n_fluct)
+
+    for start in range(0, len(pair_peak), pairs_per_chunk):
+        stop = min(start + pairs_per_chunk, len(pair_peak))
+        scaled = _scaled_totals(
+            stack_total, pair_peak[start:stop], pair_base[start:stop], array_load_type, energy_per_year_MWh
+        )
+
+        # Without noise the year is a repetition of day types: peak and energy follow from the counts
+        power_peak = scaled[:, present].max(axis=(1, 2))
+        energy = np.repeat(scaled.sum(axis=-1) @ day_counts * 0.25 / 1000, n_fluct)
+        peak = np.repeat(power_peak, n_fluct)
+
+        if noise is not None:
+            series = scaled[:, load_type, :].reshape(stop - start, 1, -1)  # (pairs, 1, steps)
+            sigma = module_4.fluctuation_sigma(fluct_grid[None, :], power_peak[:, None])  # (pairs, n_fluct)
+            series = series + (sigma[..., None] * noise).round(0)
+            peak = series.max(axis=-1).ravel()
+            energy = (series.sum(axis=-1) * 0.25 / 1000).ravel()
+
+        peak_kw[start * n_fluct:stop * n_fluct] = peak
+        energy_mwh[start * n_fluct:stop * n_fluct] = energy
+
+    summary = pd.DataFrame(
+        {
+            "Peak_factor": peak_factor,
+            "Base_factor": base_factor,
+            "Fluctuation": fluctuation,
+            "peak_kW": peak_kw,
+            "energy_MWh": energy_mwh,
+            "full_load_hours": energy_mwh * 1000 / peak_kw,
+        },
+        columns=SUMMARY_COLUMNS,
+    )
+    summary.index.name = "scenario"
+
+    """ FULL PROFILES FOR SELECTED SCENARIOS """
+    profiles = {}
+    if select is None:
+        return summary, profiles
+
+    month_factor = module_3.read_month_factors(base_path)
+    index = module_3.quarter_hour_index(year)
+    mask = np.asarray(select(summary), dtype=bool)
+
+    for scenario in summary.index[mask]:
+        adjusted = module_2.apply_peak_base_factors_batch(
+            stack, columns, peak_factor[scenario], base_factor[scenario]
+        )
+        df = pd.DataFrame(
+            module_3.seasonality_array(year_list, array_load_type, adjusted, columns, month_factor),
+            index=index,
+            columns=columns,
+        )
+        df_scaled = module_4.upscale_yearly(year, industry_number, module_3.normalising_1000(df), catalog)
+
+        if noise is not None and fluctuation[scenario] != 0:
+            sigma = module_4.fluctuation_sigma(fluctuation[scenario], np.max(df_scaled["Total"]))
+            rand_numbers = (sigma * noise).round(0)
+            df_scaled["Mechanical drives"] = df_scaled["Mechanical drives"] + rand_numbers
+            df_scaled["Total"] = df_scaled["Total"] + rand_numbers
+
+        profiles[int(scenario)] = df_scaled
+
+    return summary, profiles
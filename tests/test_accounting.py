@@ -0,0 +1,69 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from Modules import module_accounting
+
+
+def _profile(year=2020):
+    index = pd.date_range(f"{year}-01-01", f"{year}-12-31 23:45", freq="15min")
+    return pd.DataFrame({"Lighting": np.full(len(index), 100.0), "Total": np.full(len(index), 100.0)}, index=index)
+
+
+def test_hourly_prices_cover_the_year():
+    profile = _profile()
+    prices = pd.Series(50.0, index=pd.date_range("2020-01-01", "2020-12-31 23:00", freq="h"))
+    result = module_accounting.account(profile, prices)
+    assert result.loc["Total", "cost"] == pytest.approx(result.loc["Total", "energy_MWh"] * 50.0)
+
+
+def test_series_ending_before_the_profile_is_rejected():
+    profile = _profile()
+    prices = pd.Series(50.0, index=pd.date_range("2020-01-01", "2020-01-31 23:00", freq="h"))
+    with pytest.raises(ValueError, match="does not cover"):
+        module_accounting.account(profile, prices)
+
+
+def test_series_starting_after_the_profile_is_rejected():
+    profile = _profile()
+    prices = pd.Series(50.0, index=pd.date_range("2020-02-01", "2020-12-31 23:00", freq="h"))
+    with pytest.raises(ValueError, match="does not cover"):
+        module_accounting.account(profile, prices)
+
+
+def test_monthly_prices_cover_the_year():
+    profile = _profile()
+    prices = pd.Series(50.0, index=pd.date_range("2020-01-01", "2020-12-01", freq="MS"))
+    result = module_accounting.account(profile, prices)
+    assert result.loc["Total", "cost"] == pytest.approx(result.loc["Total", "energy_MWh"] * 50.0)
+
+
+def test_single_value_series_is_held():
+    profile = _profile()
+    prices = pd.Series([50.0], index=pd.DatetimeIndex(["2020-01-01"]))
+    result = module_accounting.account(profile, prices)
+    assert result.loc["Total", "cost"] == pytest.approx(result.loc["Total", "energy_MWh"] * 50.0)
+
+
+def test_series_ending_at_a_step_boundary_does_not_price_the_next_step():
+    index = pd.date_range("2020-01-01", "2020-02-01 00:00", freq="15min")
+    profile = pd.DataFrame({"Total": np.full(len(index), 100.0)}, index=index)
+    prices = pd.Series(50.0, index=pd.date_range("2020-01-01", "2020-01-31 23:00", freq="h"))
+    with pytest.raises(ValueError, match="does not cover"):
+        module_accounting.account(profile, prices)
+
+
+def test_irregular_series_needs_freq():
+    profile = _profile()
+    prices = pd.Series(50.0, index=pd.DatetimeIndex(["2020-01-01", "2020-03-01", "2020-12-01"]))
+    with pytest.raises(ValueError, match="pass freq"):
+        module_accounting.account(profile, prices)
+    result = module_accounting.account(profile, prices, freq="MS")
+    assert result.loc["Total", "cost"] == pytest.approx(result.loc["Total", "energy_MWh"] * 50.0)
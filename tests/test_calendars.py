@@ -0,0 +1,32 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from Modules import module_3
+
+
+@pytest.mark.parametrize("year", [2018, 2019, 2020, 2021, 2024])
+def test_site_without_overrides_gets_the_base_calendar(year):
+    base = np.asarray(module_3.build_load_type_calendar(year)[1], dtype=np.int8)
+    np.testing.assert_array_equal(module_3.site_calendars(year, [{}])[0], base)
+
+
+def test_base_calendar_applies_holidays():
+    calendar = module_3.build_load_type_calendar(2020)[1]
+    dates = pd.date_range("2020-01-01", "2020-12-31", freq="D")
+    assert calendar[dates.get_loc("2020-05-01")] != 1  # Labour Day, a Friday
+    assert calendar[dates.get_loc("2020-12-25")] != 1  # Christmas Day, a Friday
+
+
+def test_weekend_holidays_are_kept_for_six_day_weeks():
+    calendars = module_3.site_calendars(2020, [{"working_week": "1111110"}])
+    dates = pd.date_range("2020-01-01", "2020-12-31", freq="D")
+    assert calendars[0, dates.get_loc("2020-10-03")] != 1  # German Unity Day, a Saturday
+    assert calendars[0, dates.get_loc("2020-10-10")] == 1  # An ordinary Saturday